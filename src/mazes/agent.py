@@ -1,13 +1,252 @@
-from src.mazes.maze import Maze, Node, RectangularMaze
+import numpy as np
+
+from src.mazes.incremental import DStarLite
+from src.mazes.maze import (
+    DIRECTION_OFFSETS,
+    Direction,
+    Maze,
+    Node,
+    RectangularMaze,
+    open_moves,
+    resolve_rng,
+)
+from src.mazes.pathfinding import SearchStats
 
 
 class MazeAgent:
-    def __init__(self):
-        self.known_maze: Maze = RectangularMaze((1, 1))
-        self.known_position: Node = 0, 0
+    """ An agent finding its way to a goal through a maze it can only see from the cell it is in.
+
+    The agent starts out assuming every wall is open, and adds walls to its `known_maze` as it senses them. Its plan
+    is kept by `DStarLite`, so each discovered wall only replans the part of the route it affects.
+    """
+
+    def __init__(self, maze: RectangularMaze, start: Node, goal: Node, *, stats: SearchStats = None):
+        self.maze = maze
+        self.goal = goal
+        # Every wall starts open, at unit cost, until it is sensed
+        self.known_maze: Maze = RectangularMaze.from_wall_bits(np.zeros((maze.rows, maze.cols), dtype=np.uint8))
+        self.known_position: Node = start
+        self.heading = Direction.N
+        self.planner = DStarLite(self.known_maze, start, goal, stats=stats)
+
+    @property
+    def at_goal(self) -> bool:
+        return self.known_position == self.goal
+
+    def sense(self) -> list[Direction]:
+        """ Look at the walls around the current cell, adding any that were not known
+
+        Returns:
+            The directions of the walls that were discovered
+        """
+        position = self.known_position
+        discovered = [direction for direction, _node in self.known_maze.get_neighbours(position)
+                      if self.maze.is_wall(position, direction) and not self.known_maze.is_wall(position, direction)]
+
+        for direction in discovered:
+            self.known_maze.set_edge_cost(position, direction, float('inf'))
+        if discovered:
+            self.planner.update_nodes([position] + [self.known_maze.move(position, direction)
+                                                    for direction in discovered])
+        return discovered
+
+    def turn(self) -> Direction:
+        """ Sense the walls, replan, and face along the first move of the plan """
+        self.sense()
+        if self.planner.plan() == float('inf'):
+            raise RuntimeError(f"Could not find path from {self.known_position} to {self.goal}")
+
+        next_node = self.planner.next_node()
+        self.heading = next(direction for direction, node in self.known_maze.get_neighbours(self.known_position)
+                            if node == next_node)
+        return self.heading
+
+    def drive(self) -> bool:
+        """ Move one cell along the current heading
+
+        Returns:
+            Whether the agent moved, which it cannot if the heading is blocked by a wall
+        """
+        if self.maze.is_wall(self.known_position, self.heading):
+            self.sense()
+            return False
+
+        self.known_position = self.known_maze.move(self.known_position, self.heading)
+        self.planner.move_start(self.known_position)
+        return True
+
+    def step(self) -> Node:
+        self.turn()
+        self.drive()
+        return self.known_position
+
+    def explore(self, max_steps: int = None) -> list[Node]:
+        """ Step toward the goal until reaching it, or until `max_steps` moves have been made
+
+        Returns:
+            Every cell the agent visited, in order
+        """
+        trail = [self.known_position]
+        while not self.at_goal and (max_steps is None or len(trail) <= max_steps):
+            trail.append(self.step())
+        return trail
+
+
+# The default limit on the memory an `AgentSwarm` may take for its visit counts
+MAX_VISIT_BYTES = 2 ** 30
+
+
+class AgentSwarm:
+    """ Many agents exploring the same maze at once, each stepped by one vectorised tick.
+
+    Agents choose moves from what they have seen rather than planning: every tick each agent moves to the open
+    neighbour it has visited the fewest times, breaking ties at random. This is enough to explore any finite maze, and
+    needs nothing per agent but its visit counts, kept as one `(agents, rows * cols)` uint8 array.
+
+    That array takes one byte per agent per cell, so 5000 agents on a 1000x1000 maze would need 5 GB. Swarms whose
+    counts would take more than `max_visit_bytes` are refused when they are created; split larger runs into several
+    swarms, or raise the limit where the memory is there.
+
+    Cell ids are `row * cols + col`, as in `MazeGraph`. `agent(index)` gives a single agent with the interface of
+    `MazeAgent`, backed by the swarm's arrays.
+    """
+
+    def __init__(self, maze: RectangularMaze, starts, goals, rng: np.random.Generator = None, *,
+                 max_visit_bytes: int = MAX_VISIT_BYTES):
+        """
+        Args:
+            maze: The maze to explore, whose walls are read once, here
+            starts: An `(agents, 2)` array-like of the cell each agent starts in
+            goals: An `(agents, 2)` array-like of the cell each agent is looking for, or a single cell for all of them
+            rng: The generator used to break ties, or None for the shared module generator
+            max_visit_bytes: The most memory the visit counts may take
+
+        Raises:
+            ValueError: If the visit counts of this many agents on this maze would take more than `max_visit_bytes`
+        """
+        rows, cols = maze.rows, maze.cols
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        visit_bytes = len(starts) * rows * cols
+        if visit_bytes > max_visit_bytes:
+            raise ValueError(f'The visit counts of {len(starts)} agents on a {rows}x{cols} maze would take '
+                             f'{visit_bytes / 2 ** 30:.1f} GiB, over the {max_visit_bytes / 2 ** 30:.1f} GiB limit')
+
+        self.maze = maze
+        self.rng = resolve_rng(rng)
+
+        self.is_open = open_moves(maze.wall_bits()).reshape(-1, 4)
+        self.offsets = np.array([d_row * cols + d_col for d_row, d_col in DIRECTION_OFFSETS], dtype=np.int64)
+
+        goals = np.broadcast_to(np.asarray(goals, dtype=np.int64).reshape(-1, 2), starts.shape)
+        self.positions = starts[:, 0] * cols + starts[:, 1]
+        self.goals = goals[:, 0] * cols + goals[:, 1]
+        self.headings = np.full(len(starts), Direction.N.value, dtype=np.int8)
+        self.steps = np.zeros(len(starts), dtype=np.int64)
+        self.done = self.positions == self.goals
+
+        self.visits = np.zeros((len(starts), rows * cols), dtype=np.uint8)
+        self.visits[np.arange(len(starts)), self.positions] = 1
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def agent(self, index: int) -> 'SwarmAgent':
+        return SwarmAgent(self, index)
+
+    def nodes(self) -> np.ndarray:
+        """ The `(agents, 2)` row and column of every agent """
+        return np.stack(np.divmod(self.positions, self.maze.cols), axis=1)
+
+    def turn(self, agents: np.ndarray):
+        """ Face each of the given agents toward its least visited open neighbour """
+        positions = self.positions[agents]
+        is_open = self.is_open[positions]
+        neighbours = np.where(is_open, positions[:, np.newaxis] + self.offsets, positions[:, np.newaxis])
+
+        scores = self.visits[agents[:, np.newaxis], neighbours] + self.rng.random(is_open.shape)
+        scores[~is_open] = np.inf
+        boxed_in = ~is_open.any(axis=1)
+        self.headings[agents] = np.where(boxed_in, self.headings[agents], np.argmin(scores, axis=1))
+
+    def drive(self, agents: np.ndarray) -> np.ndarray:
+        """ Move each of the given agents one cell along its heading
+
+        Returns:
+            Whether each agent moved, which it cannot where its heading is blocked by a wall
+        """
+        positions, headings = self.positions[agents], self.headings[agents]
+        moved = self.is_open[positions, headings]
+        positions = np.where(moved, positions + self.offsets[headings], positions)
+
+        self.positions[agents] = positions
+        self.steps[agents] += moved
+        visits = self.visits[agents, positions]
+        self.visits[agents, positions] = np.where(visits < 255, visits + 1, visits)
+        self.done[agents] |= positions == self.goals[agents]
+        return moved
+
+    def tick(self) -> int:
+        """ Turn and drive every agent that has not reached its goal
+
+        Returns:
+            The number of agents still exploring
+        """
+        active = np.flatnonzero(~self.done)
+        self.turn(active)
+        self.drive(active)
+        return int(np.count_nonzero(~self.done))
+
+    def run(self, max_ticks: int = None) -> int:
+        """ Tick until every agent has reached its goal, or `max_ticks` have passed
+
+        Returns:
+            The number of ticks run
+        """
+        ticks = 0
+        while not self.done.all() and (max_ticks is None or ticks < max_ticks):
+            self.tick()
+            ticks += 1
+        return ticks
+
+
+class SwarmAgent:
+    """ One agent of an `AgentSwarm`, with the interface of `MazeAgent` """
+
+    def __init__(self, swarm: AgentSwarm, index: int):
+        self.swarm = swarm
+        self.index = index
+        self._agents = np.array([index])
+
+    @property
+    def known_position(self) -> Node:
+        return divmod(int(self.swarm.positions[self.index]), self.swarm.maze.cols)
+
+    @property
+    def goal(self) -> Node:
+        return divmod(int(self.swarm.goals[self.index]), self.swarm.maze.cols)
+
+    @property
+    def heading(self) -> Direction:
+        return Direction(int(self.swarm.headings[self.index]))
+
+    @property
+    def at_goal(self) -> bool:
+        return bool(self.swarm.done[self.index])
+
+    def turn(self) -> Direction:
+        self.swarm.turn(self._agents)
+        return self.heading
+
+    def drive(self) -> bool:
+        return bool(self.swarm.drive(self._agents)[0])
 
-    def turn(self):
-        pass
+    def step(self) -> Node:
+        self.turn()
+        self.drive()
+        return self.known_position
 
-    def drive(self):
-        pass
+    def explore(self, max_steps: int = None) -> list[Node]:
+        trail = [self.known_position]
+        while not self.at_goal and (max_steps is None or len(trail) <= max_steps):
+            trail.append(self.step())
+        return trail
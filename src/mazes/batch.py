@@ -0,0 +1,79 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.mazes.maze import (
+    ALL_WALLS,
+    CompactRectangularMaze,
+)
+
+LOG = logging.getLogger('BatchGeneration')
+LOG.setLevel(logging.INFO)
+
+
+def _generate_into(buffer, algorithm, seeds: list[np.random.SeedSequence], first_index: int, loop_chance: float):
+    """ Generate consecutive mazes of a batch in place, writing their wall bits into the batch buffer """
+    for index, seed in enumerate(seeds, first_index):
+        wall_bits = buffer[index]
+        wall_bits[:] = ALL_WALLS
+        algorithm(CompactRectangularMaze.from_wall_bits(wall_bits), loop_chance=loop_chance,
+                  rng=np.random.default_rng(seed))
+
+
+def _generate_shared(memory_name: str, shape: tuple[int, int, int], algorithm, seeds, first_index, loop_chance):
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        buffer = np.ndarray(shape, dtype=np.uint8, buffer=memory.buf)
+        _generate_into(buffer, algorithm, seeds, first_index, loop_chance)
+        del buffer
+    finally:
+        memory.close()
+
+
+def generate_batch(algorithm, dims: tuple[int, int], count: int, seed: int | None = None, workers: int | None = 1, *,
+                   loop_chance: float = 0.0) -> np.ndarray:
+    """ Generate many mazes at once, spread across a pool of worker processes.
+
+    Each maze draws from its own generator, spawned from a `SeedSequence` of `seed`, so a given seed produces the same
+    mazes whatever the number of workers. Workers write straight into a shared memory buffer rather than pickling mazes.
+
+    Args:
+        algorithm: A generation function from `maze_generation`
+        dims: The rows and columns of every maze
+        count: The number of mazes to generate
+        seed: The entropy for the batch, or None for a fresh random batch
+        workers: The number of worker processes, None for one per CPU, or 1 to generate in this process
+        loop_chance: Passed on to the generation algorithm
+
+    Returns:
+        A `(count, rows, cols)` uint8 array of the `WALL_BITS` of every maze, which `CompactRectangularMaze.from_wall_bits`
+            will wrap
+    """
+    seeds = np.random.SeedSequence(seed).spawn(count)
+    shape = (count, *dims)
+    LOG.info(f'Generating {count} {dims[0]}x{dims[1]} mazes using `{algorithm.__name__}`')
+
+    if workers == 1 or count <= 1:
+        mazes = np.empty(shape, dtype=np.uint8)
+        _generate_into(mazes, algorithm, seeds, 0, loop_chance)
+        return mazes
+
+    workers = workers or os.cpu_count()
+    memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape))))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Several chunks per worker keeps the pool busy when some mazes take longer than others
+            chunks = np.array_split(np.arange(count), min(count, workers * 4))
+            futures = [pool.submit(_generate_shared, memory.name, shape, algorithm,
+                                   seeds[chunk[0]:chunk[-1] + 1], int(chunk[0]), loop_chance)
+                       for chunk in chunks if chunk.size]
+            for future in futures:
+                future.result()
+
+        return np.ndarray(shape, dtype=np.uint8, buffer=memory.buf).copy()
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,248 @@
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.mazes.gui import (
+    GENERATION_ALGORITHMS,
+    PATHFINDING_ALGORITHMS,
+)
+from src.mazes.maze import (
+    Maze,
+    Node,
+    RectangularMaze,
+)
+from src.mazes.maze_generation import kruskals
+from src.mazes.pathfinding import (
+    SearchStats,
+    reconstruct_path,
+    weighted_a_star,
+)
+
+LOG = logging.getLogger('Benchmark')
+LOG.setLevel(logging.INFO)
+
+SIZE_LADDER = ((10, 10), (50, 50), (100, 100), (250, 250), (500, 500), (1000, 1000), (2000, 2000))
+SEED = 20240101
+
+# Solvers are all run against the same mazes, made by a fast generator so that large sizes stay affordable
+SOLVER_MAZE_ALGORITHM = kruskals
+
+# Timings under this many seconds are too noisy to flag as regressions
+MIN_COMPARABLE_SECONDS = 0.05
+
+
+def _linear_scan_a_star(maze: Maze, start: Node, finish: Node, *, weight: float = 2.0) -> tuple[dict, list[Node]]:
+    """ The original set-based frontier, which scans every queued node to find the next one to expand """
+    frontier_set = {start}
+
+    move_map = {start: None}
+    g_score = {start: 0}
+    f_score = {start: maze.find_distance(start, finish) * weight}
+
+    while frontier_set:
+        current_node = min(frontier_set, key=lambda n: f_score[n])
+        if current_node == finish:
+            return g_score, reconstruct_path(move_map, finish)
+
+        frontier_set.remove(current_node)
+
+        for direction, node in maze.get_neighbours(current_node):
+            possible_g_score = g_score[current_node] + maze.edge_cost(current_node, direction)
+            if possible_g_score < g_score.get(node, float('inf')):
+                g_score[node] = possible_g_score
+                f_score[node] = possible_g_score + maze.find_distance(node, finish) * weight
+                move_map[node] = current_node
+                frontier_set.add(node)
+
+    raise RuntimeError(f"Could not find path from {start} to {finish}: {move_map}")
+
+
+def frontier_scaling(sizes=(50, 100, 200, 400), weight: float = 0) -> list[dict]:
+    """ Time a corner-to-corner search with the heap frontier against the linear-scan frontier.
+
+    The mazes are open grids, which keeps the frontier as wide as possible and isolates its cost.
+    """
+    results = []
+    for size in sizes:
+        maze = RectangularMaze.blank_maze((size, size))
+        maze.maze_array[:] = 1
+        start, finish = (0, 0), (size - 1, size - 1)
+
+        timings = {}
+        for name, solver in (('heap', weighted_a_star), ('linear_scan', _linear_scan_a_star)):
+            begin = time.perf_counter()
+            g_score, _path = solver(maze, start, finish, weight=weight)
+            timings[name] = time.perf_counter() - begin
+            if g_score[finish] != 2 * (size - 1):
+                raise RuntimeError(f"{name} found a sub-optimal path on the {size}x{size} grid")
+
+        results.append({'size': size, 'cells': size * size, **timings})
+        LOG.info(f"{size}x{size}: heap {timings['heap']:.3f}s, linear scan {timings['linear_scan']:.3f}s")
+    return results
+
+
+def _measure(function, measure_memory: bool) -> tuple[dict, object]:
+    """ Time a call, then repeat it under tracemalloc for its peak memory, since tracing distorts the timing """
+    begin = time.perf_counter()
+    result = function()
+    record = {'seconds': time.perf_counter() - begin}
+
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            function()
+            record['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return record, result
+
+
+def _ladder(name: str, sizes, time_budget: float, run_size) -> list[dict]:
+    """ Run one algorithm up the size ladder, skipping the larger sizes once a size has exceeded the time budget """
+    records = []
+    over_budget = False
+    for dims in sizes:
+        record = {'algorithm': name, 'size': list(dims)}
+        if over_budget:
+            record['skipped'] = f'a smaller size took over {time_budget}s'
+        else:
+            try:
+                record.update(run_size(dims))
+                over_budget = record['seconds'] > time_budget
+            except Exception as e:
+                record['error'] = f'{e.__class__.__name__}: {e}'
+            LOG.info(f"{name} {dims[0]}x{dims[1]}: {record.get('seconds', record.get('error'))}")
+        records.append(record)
+    return records
+
+
+def benchmark_generation(sizes=SIZE_LADDER, *, seed: int = SEED, time_budget: float = 120,
+                         measure_memory: bool = True) -> list[dict]:
+    """ Time and measure every algorithm in `GENERATION_ALGORITHMS` across a ladder of maze sizes """
+    records = []
+    for name, algorithm in GENERATION_ALGORITHMS.items():
+        def run_size(dims):
+            def generate():
+                algorithm(RectangularMaze(dims), rng=np.random.default_rng(seed))
+
+            record, _ = _measure(generate, measure_memory)
+            return record
+
+        records.extend(_ladder(name, sizes, time_budget, run_size))
+    return records
+
+
+def benchmark_pathfinding(sizes=SIZE_LADDER, *, seed: int = SEED, time_budget: float = 120,
+                          measure_memory: bool = True) -> list[dict]:
+    """ Time and measure every solver in `PATHFINDING_ALGORITHMS` across a ladder of maze sizes.
+
+    Each size uses one maze and one pair of endpoints, drawn from `seed`, for every solver.
+    """
+    problems = {}
+    for dims in sizes:
+        rng = np.random.default_rng(seed)
+        maze = RectangularMaze(dims)
+        SOLVER_MAZE_ALGORITHM(maze, rng=rng)
+        problems[dims] = maze, maze.random_node(rng), maze.random_node(rng)
+
+    records = []
+    for name, solver in PATHFINDING_ALGORITHMS.items():
+        def run_size(dims):
+            maze, start, finish = problems[dims]
+            stats = SearchStats()
+            record, (g_score, path) = _measure(lambda: solver(maze, start, finish, stats=stats), measure_memory)
+            record['nodes_expanded'] = stats.expanded // stats.queries
+            record['frontier_peak'] = stats.frontier_peak
+            record['path_cost'] = float(g_score[finish])
+            return record
+
+        records.extend(_ladder(name, sizes, time_budget, run_size))
+    return records
+
+
+def run_suite(sizes=SIZE_LADDER, *, seed: int = SEED, time_budget: float = 120, measure_memory: bool = True) -> dict:
+    return {
+        'meta': {
+            'seed': seed,
+            'sizes': [list(dims) for dims in sizes],
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'generation': benchmark_generation(sizes, seed=seed, time_budget=time_budget, measure_memory=measure_memory),
+        'pathfinding': benchmark_pathfinding(sizes, seed=seed, time_budget=time_budget, measure_memory=measure_memory),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 1.5) -> list[str]:
+    """ List every measurement that has regressed beyond `tolerance` times its baseline value """
+    regressions = []
+    for kind in ('generation', 'pathfinding'):
+        baseline_records = {(record['algorithm'], tuple(record['size'])): record for record in baseline.get(kind, [])}
+        for record in results.get(kind, []):
+            key = record['algorithm'], tuple(record['size'])
+            label = f"{kind} {key[0]} {key[1][0]}x{key[1][1]}"
+            if key not in baseline_records:
+                continue
+            base = baseline_records[key]
+
+            if 'error' in record and 'error' not in base:
+                regressions.append(f"{label}: now fails with {record['error']}")
+                continue
+            if 'seconds' not in record or 'seconds' not in base:
+                continue
+
+            if max(record['seconds'], base['seconds']) >= MIN_COMPARABLE_SECONDS \
+                    and record['seconds'] > base['seconds'] * tolerance:
+                regressions.append(f"{label}: {record['seconds']:.3f}s against {base['seconds']:.3f}s")
+            if 'peak_bytes' in record and 'peak_bytes' in base and record['peak_bytes'] > base['peak_bytes'] * tolerance:
+                regressions.append(f"{label}: peak {record['peak_bytes']} bytes against {base['peak_bytes']}")
+            if 'nodes_expanded' in record and 'nodes_expanded' in base \
+                    and record['nodes_expanded'] > base['nodes_expanded'] * tolerance:
+                regressions.append(f"{label}: {record['nodes_expanded']} nodes against {base['nodes_expanded']}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark maze generation and pathfinding across maze sizes')
+    parser.add_argument('--output', default='benchmark_results.json', help='where to write the JSON results')
+    parser.add_argument('--baseline', help='JSON results to compare against, failing on regressions')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='allowed ratio over the baseline')
+    parser.add_argument('--max-size', type=int, default=SIZE_LADDER[-1][0], help='largest side length to run')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--time-budget', type=float, default=120,
+                        help='seconds a size may take before larger sizes of that algorithm are skipped')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak memory runs')
+    parser.add_argument('--frontier', action='store_true', help='only run the heap against linear-scan comparison')
+    args = parser.parse_args(argv)
+
+    if args.frontier:
+        frontier_scaling()
+        return 0
+
+    sizes = [dims for dims in SIZE_LADDER if max(dims) <= args.max_size]
+    results = run_suite(sizes, seed=args.seed, time_budget=args.time_budget, measure_memory=not args.no_memory)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    LOG.info(f'Wrote results to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            LOG.error(f'Regression: {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    sys.exit(main())
@@ -1,8 +1,14 @@
 import logging
+import multiprocessing
+import queue
 import tkinter as tk
 from tkinter import ttk
 
-from src.mazes.maze import RectangularMaze
+from src.mazes.junction_graph import junction_search
+from src.mazes.maze import (
+    RectangularMaze,
+    move_history_array,
+)
 from src.mazes.maze_generation import (
     aldous_broder,
     brinary_tree,
@@ -15,34 +21,37 @@ from src.mazes.maze_generation import (
     recursive_backtrack,
     recursive_divison,
     sidewinder,
+    simplified_prims,
     wilsons,
 )
-from src.mazes.maze_views import (
-    AsciiView,
-    TkRectCanvas,
-)
+from src.mazes.maze_views import TkRectCanvas
 from src.mazes.pathfinding import (
     a_star,
+    bidirectional_a_star,
+    bidirectional_breadth_first_search,
     breadth_first_search,
     depth_first_search_iterative,
     depth_first_search_recursive,
     dijkstras,
+    maze_diameter,
+    sample_endpoints,
     weighted_a_star,
 )
 
 GENERATION_ALGORITHMS = {
     'Iterative Backtrack': iterative_backtrack,
     'Recursive Backtrack': recursive_backtrack,
-    "Ellers x": ellers,
-    "Kruskal's x": kruskals,
+    "Eller's": ellers,
+    "Kruskal's": kruskals,
     "Prim's": prims,
+    "Simplified Prim's": simplified_prims,
     'Recursive Divison x': recursive_divison,
     'Aldous-Broder x': aldous_broder,
     "Wilson's": wilsons,
     'Hunt and Kill x': hunt_and_kill,
     'Growing Tree x': growing_tree,
-    'Binary Tree x': brinary_tree,
-    'Sidewinder x': sidewinder,
+    'Binary Tree': brinary_tree,
+    'Sidewinder': sidewinder,
 }
 
 PATHFINDING_ALGORITHMS = {
@@ -50,11 +59,64 @@ PATHFINDING_ALGORITHMS = {
     "A*": a_star,
     "Weighted A*": weighted_a_star,
     "Breadth First Search": breadth_first_search,
+    "Bidirectional A*": bidirectional_a_star,
+    "Bidirectional BFS": bidirectional_breadth_first_search,
+    "Junction Graph": junction_search,
     "Depth First Search (Recursive)": depth_first_search_recursive,
     "Depth First Search (Iterative)": depth_first_search_iterative,
 }
 
 
+# How often the gui checks on a running job, in milliseconds
+POLL_MS = 50
+# How long to wait for a last message from a job whose process has already exited, in seconds
+FINAL_MESSAGE_TIMEOUT = 0.5
+
+# The stages of a job, with the progress made once each has started
+JOB_STAGES = {
+    'Generating': 0.0,
+    'Choosing endpoints': 0.6,
+    'Solving': 0.8,
+}
+
+
+def _run_job(results: multiprocessing.Queue, dims: tuple[int, int], generation_name: str, pathfinding_name: str,
+             visualise: bool):
+    """ Generate and solve a maze, in a worker process, reporting back through `results`.
+
+    Each message is a `(kind, payload)` pair: `('progress', stage)` as each stage starts, then either
+    `('done', result)` with the maze's wall bits, endpoints, path and move histories, or `('error', message)`. The
+    move histories are sent as arrays from `move_history_array`, which are far cheaper to unpickle than the lists.
+    """
+    try:
+        results.put(('progress', 'Generating'))
+        maze = RectangularMaze(dims)
+        generation_history = [] if visualise else None
+        GENERATION_ALGORITHMS[generation_name](maze, loop_chance=0.0, move_history=generation_history)
+
+        # Aim for a path through a tenth of the maze, settling for the longest path if there is none that long
+        results.put(('progress', 'Choosing endpoints'))
+        minimum_path_cost = dims[0] * dims[1] * 0.1
+        start, finish, diameter = maze_diameter(maze)
+        if diameter >= minimum_path_cost:
+            start, finish, _ = sample_endpoints(maze, minimum_path_cost)
+
+        results.put(('progress', 'Solving'))
+        search_history = [] if visualise else None
+        _g_score, path = PATHFINDING_ALGORITHMS[pathfinding_name](maze, start, finish, move_history=search_history)
+
+        results.put(('done', {
+            'wall_bits': maze.wall_bits(),
+            'start': start,
+            'finish': finish,
+            'path': path,
+            'generation_history': None if generation_history is None else move_history_array(generation_history),
+            'search_history': None if search_history is None else move_history_array(search_history),
+        }))
+    except Exception as error:
+        results.put(('error', f'{type(error).__name__}: {error}'))
+
+
 class MazeGui:
     """
     The controller component of the MVC gui model
@@ -73,11 +135,20 @@ class MazeGui:
         self.cols_tk = tk.IntVar(value=30, name='ColCount')
         self.plot_path_tk = tk.BooleanVar(value=True, name='PlotPath')
         self.visualise_generation_tk = tk.BooleanVar(value=False, name='VisualiseGeneration')
+        self.replay_speed_tk = tk.DoubleVar(value=3.0, name='ReplaySpeed')  # log10 of events per second
         self.generation_algorithm_tk = tk.StringVar(value='Iterative Backtrack', name='GenerationAlgorithm')
         self.pathfinding_algorithm_tk = tk.StringVar(value='A*', name='PathfindingAlgorithm')
 
+        self.status_tk = tk.StringVar(value='', name='Status')
+
         self.maze = RectangularMaze.blank_maze((self.rows_tk.get(), self.cols_tk.get()))
 
+        # Jobs run in a fresh process each, so one can be abandoned at any point by terminating it
+        self.job_context = multiprocessing.get_context('spawn')
+        self.job: multiprocessing.Process = None
+        self.job_results: multiprocessing.Queue = None
+        self.job_poll = None
+
         self.view = TkRectCanvas(self.frame, self.maze)
         self.view.frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
@@ -86,19 +157,33 @@ class MazeGui:
 
         ttk.Button(self.options_frame, text='Generate', command=self.generate_custom_maze).pack(
             side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5, ipadx=5, ipady=5)
+        self.cancel_button = ttk.Button(self.options_frame, text='Cancel', command=self.cancel_job, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5, ipadx=5, ipady=5)
         ttk.Checkbutton(self.options_frame, text='Show Solution', variable=self.plot_path_tk, command=self.view.toggle_path).pack(
             side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5, ipadx=5, ipady=5)
         ttk.Checkbutton(self.options_frame, text='Visualise Generation', variable=self.visualise_generation_tk).pack(
             side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5, ipadx=5, ipady=5)
+        ttk.Scale(self.options_frame, from_=1.0, to=6.0, variable=self.replay_speed_tk, command=self.set_replay_speed).pack(
+            side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5, ipadx=5, ipady=5)
         ttk.Combobox(self.options_frame, textvariable=self.generation_algorithm_tk, values=list(GENERATION_ALGORITHMS.keys())).pack(
             side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5, ipadx=5, ipady=5)
         ttk.Combobox(self.options_frame, textvariable=self.pathfinding_algorithm_tk, values=list(PATHFINDING_ALGORITHMS.keys())).pack(
             side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5, ipadx=5, ipady=5)
 
+        self.status_frame = ttk.Frame(self.frame)
+        self.status_frame.pack(side=tk.TOP, fill=tk.X, expand=False)
+        self.progress = ttk.Progressbar(self.status_frame, maximum=1.0, mode='determinate')
+        self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        ttk.Label(self.status_frame, textvariable=self.status_tk, width=24).pack(
+            side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5)
+
+        self.root.protocol('WM_DELETE_WINDOW', self.close)
+
         # Configure window size and placement
         self.root.resizable(True, True)
         self.root.eval('tk::PlaceWindow . center')
         self.root.minsize(self.root.winfo_width(), self.root.winfo_height())
+        self.set_replay_speed()
 
     @property
     def generation_algorithm(self):
@@ -108,42 +193,115 @@ class MazeGui:
     def pathfinding_algorithm(self):
         return PATHFINDING_ALGORITHMS[self.pathfinding_algorithm_tk.get()]
 
-    def generate_custom_maze(self):
-        MAZE_DIMS = self.rows_tk.get(), self.cols_tk.get()
-
-        minimum_path_cost = MAZE_DIMS[0] * MAZE_DIMS[1] * 0.1
-        finish_score = 0
-
-        while finish_score < minimum_path_cost:
-            maze = RectangularMaze(MAZE_DIMS)
-            self.generation_algorithm(maze, loop_chance=0.0)
-
-            for _ in range(int(MAZE_DIMS[0] * MAZE_DIMS[1] * 0.1)):
-                start = maze.random_node()
-                finish = maze.random_node()
-
-                self.log.debug(f"Beginning search at {start}")
-                try:
-                    g_scores, path = a_star(maze, start, finish)
-                except:
-                    AsciiView(maze, start, finish)
-                    raise
-                finish_score = g_scores[finish]
-
-                self.log.debug(f"Reached {finish} with a cost of {finish_score}")
-                if finish_score >= minimum_path_cost:
-                    break
+    def set_replay_speed(self, *_args):
+        self.view.replay_speed = 10 ** self.replay_speed_tk.get()
 
+    def generate_custom_maze(self):
+        """ Start generating and solving a new maze in the background, abandoning any job already running """
+        self.cancel_job()
+        self.view.stop_replay()
+
+        self.job_results = self.job_context.Queue()
+        self.job = self.job_context.Process(
+            target=_run_job,
+            args=(self.job_results, (self.rows_tk.get(), self.cols_tk.get()), self.generation_algorithm_tk.get(),
+                  self.pathfinding_algorithm_tk.get(), self.visualise_generation_tk.get()),
+            daemon=True)
+        self.job.start()
+
+        self.cancel_button.configure(state=tk.NORMAL)
+        self.set_progress('Starting', 0.0)
+        self.job_poll = self.root.after(POLL_MS, self.poll_job)
+
+    def cancel_job(self):
+        """ Stop the running job, if there is one, discarding anything it has not yet reported """
+        if self.job_poll is not None:
+            self.root.after_cancel(self.job_poll)
+            self.job_poll = None
+        if self.job is not None:
+            if self.job.is_alive():
+                self.job.terminate()
+                self.set_progress('Cancelled', 0.0)
+            self.job.join()
+            self.job = None
+        if self.job_results is not None:
+            self.job_results.cancel_join_thread()
+            self.job_results.close()
+            self.job_results = None
+        self.cancel_button.configure(state=tk.DISABLED)
+
+    def set_progress(self, status: str, fraction: float):
+        self.status_tk.set(status)
+        self.progress.configure(value=fraction)
+
+    def poll_job(self):
+        """ Handle whatever the running job has reported since the last poll """
+        self.job_poll = None
+        # Checked before reading, so whatever a finished job reported is already on its way through the queue. Its
+        #  last message may still be in the pipe, so reads wait a little for it rather than giving up when it is empty
+        exited = not self.job.is_alive()
+        while True:
+            try:
+                kind, payload = self.job_results.get(block=exited, timeout=FINAL_MESSAGE_TIMEOUT)
+            except queue.Empty:
+                break
+
+            if kind == 'progress':
+                self.set_progress(payload, JOB_STAGES[payload])
+            elif kind == 'done':
+                self.finish_job()
+                self.set_progress('Done', 1.0)
+                self.show_result(payload)
+                return
+            else:
+                self.log.error(f"Maze generation failed: {payload}")
+                self.finish_job()
+                self.set_progress('Failed', 0.0)
+                return
+
+        if exited:
+            # The process died without reporting, so there is nothing more to wait for
+            self.log.error(f"Maze generation exited with code {self.job.exitcode}")
+            self.finish_job()
+            self.set_progress('Failed', 0.0)
+            return
+        self.job_poll = self.root.after(POLL_MS, self.poll_job)
+
+    def finish_job(self):
+        self.job.join()
+        self.job = None
+        self.job_results.close()
+        self.job_results = None
+        self.cancel_button.configure(state=tk.DISABLED)
+
+    def show_result(self, result: dict):
+        maze = RectangularMaze.from_wall_bits(result['wall_bits'])
+        start, finish, path = result['start'], result['finish'], result['path']
+        self.log.debug(f"Searched from {start} to {finish}")
+
+        self.maze = maze
         self.view.maze = maze
         self.view.start = start
         self.view.finish = finish
         self.view.path = None
         self.view.draw_maze()
 
-        _g_score, path = self.pathfinding_algorithm(maze, start, finish)
-        self.view.path = path[1:-1]
-        if self.plot_path_tk.get():
-            self.view.draw_path()
+        def show_path():
+            self.view.path = path[1:-1]
+            # The view follows the Show Solution checkbox through `toggle_path`
+            if self.view.path_visible:
+                self.view.draw_path()
+
+        if result['generation_history'] is not None:
+            # Replay the generation, then the search, and only then reveal the path it found
+            self.view.replay(result['generation_history'],
+                             on_finish=lambda: self.view.replay(result['search_history'], on_finish=show_path))
+        else:
+            show_path()
+
+    def close(self):
+        self.cancel_job()
+        self.root.destroy()
 
     def generate_maze(self):
         MAZE_DIMS = self.rows_tk.get(), self.cols_tk.get()
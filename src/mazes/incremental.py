@@ -0,0 +1,124 @@
+""" Incremental replanning, for searches that are repeated as the maze they run on changes.
+
+`DStarLite` keeps its search state between plans. When edge costs change, only the nodes whose cost to the goal is
+affected are searched again, rather than the whole path being planned from scratch.
+"""
+import logging
+from contextlib import nullcontext
+
+from src.mazes.maze import (
+    Maze,
+    Node,
+)
+from src.mazes.pathfinding import (
+    PriorityFrontier,
+    SearchStats,
+)
+
+LOG = logging.getLogger('Incremental')
+LOG.setLevel(logging.INFO)
+
+
+class DStarLite:
+    """ D* Lite, planning from a moving start to a fixed goal on a maze whose edge costs may change between plans.
+
+    The search runs backward from the goal, so when the start moves only the heuristic changes, which is absorbed into
+    the key modifier `km` instead of re-keying the frontier. Each node has its cost to the goal from the last expansion,
+    `g`, and a one-step lookahead of it, `rhs`; the frontier holds the nodes where the two disagree.
+
+    Call `update_nodes` with the nodes around any edge whose cost changes, `move_start` as the start moves, then `plan`.
+    """
+
+    def __init__(self, maze: Maze, start: Node, goal: Node, *, stats: SearchStats = None):
+        self.maze = maze
+        self.start = start
+        self.goal = goal
+        self.stats = stats
+
+        self.km = 0
+        self._last_start = start
+        self._g = {}
+        self._rhs = {goal: 0}
+        self._frontier = PriorityFrontier()
+        self._frontier.push(goal, self._key(goal))
+
+    def g(self, node: Node) -> float:
+        return self._g.get(node, float('inf'))
+
+    def rhs(self, node: Node) -> float:
+        return self._rhs.get(node, float('inf'))
+
+    def _key(self, node: Node) -> tuple[float, float]:
+        best = min(self.g(node), self.rhs(node))
+        return best + self.maze.find_distance(self.start, node) + self.km, best
+
+    def _update_node(self, node: Node):
+        if node != self.goal:
+            self._rhs[node] = min((cost + self.g(neighbour) for neighbour, cost in self.maze.weighted_neighbours(node)),
+                                  default=float('inf'))
+        if self.g(node) != self.rhs(node):
+            self._frontier.push(node, self._key(node))
+            if self.stats is not None:
+                self.stats.relaxed += 1
+                self.stats.frontier_peak = max(self.stats.frontier_peak, len(self._frontier))
+        else:
+            self._frontier.remove(node)
+
+    def update_nodes(self, nodes):
+        """ Re-evaluate nodes whose edge costs have changed. Both ends of a changed edge should be passed """
+        for node in nodes:
+            self._update_node(node)
+
+    def move_start(self, start: Node):
+        """ Move the start, keeping the search state """
+        self.km += self.maze.find_distance(self._last_start, start)
+        self._last_start = self.start = start
+
+    def plan(self) -> float:
+        """ Search until the cost from the start to the goal is settled
+
+        Returns:
+            The cost of the cheapest path from the start, infinite if the goal cannot be reached
+        """
+        frontier = self._frontier
+        if self.stats is not None:
+            self.stats.queries += 1
+        with nullcontext() if self.stats is None else self.stats.phase('search'):
+            while frontier and (frontier.peek() < self._key(self.start) or self.rhs(self.start) > self.g(self.start)):
+                node, old_key = frontier.pop()
+                if self.stats is not None:
+                    self.stats.expanded += 1
+
+                new_key = self._key(node)
+                if old_key < new_key:
+                    frontier.push(node, new_key)
+                elif self.g(node) > self.rhs(node):
+                    self._g[node] = self.rhs(node)
+                    for neighbour, _cost in self.maze.weighted_neighbours(node):
+                        self._update_node(neighbour)
+                else:
+                    self._g[node] = float('inf')
+                    self._update_node(node)
+                    for neighbour, _cost in self.maze.weighted_neighbours(node):
+                        self._update_node(neighbour)
+        return self.rhs(self.start)
+
+    def next_node(self, node: Node = None) -> Node:
+        """ The neighbour to move to from a node, the start by default, to follow the planned path """
+        node = self.start if node is None else node
+        best_cost, best_node = float('inf'), None
+        for neighbour, cost in self.maze.weighted_neighbours(node):
+            if cost + self.g(neighbour) < best_cost:
+                best_cost, best_node = cost + self.g(neighbour), neighbour
+        if best_node is None:
+            raise RuntimeError(f"Could not find path from {node} to {self.goal}")
+        return best_node
+
+    def path(self) -> list[Node]:
+        """ The planned path from the start to the goal, as of the last `plan` """
+        path = [self.start]
+        while path[-1] != self.goal:
+            if len(path) > len(self.maze.node_set):
+                raise RuntimeError(f"The plan from {self.start} to {self.goal} is out of date")
+            path.append(self.next_node(path[-1]))
+        return path
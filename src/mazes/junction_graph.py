@@ -0,0 +1,296 @@
+""" A corridor-contraction index, which collapses the corridors of a maze into a weighted graph of its junctions.
+
+Cells with exactly two open neighbours are corridor cells, and every other cell is a junction. Each corridor runs
+between two junctions (possibly the same one) and becomes a single edge, so queries search only the junctions and
+expand the corridors they pass through back into cells at the end. A cycle with no junction on it has one of its cells
+made a junction so that it still has an edge.
+"""
+import logging
+import weakref
+from contextlib import nullcontext
+
+import numpy as np
+
+from src.mazes.maze import (
+    Moves,
+    Node,
+    RectangularMaze,
+)
+from src.mazes.pathfinding import (
+    PriorityFrontier,
+    SearchStats,
+)
+
+LOG = logging.getLogger('JunctionGraph')
+LOG.setLevel(logging.INFO)
+
+# The index of each maze, kept only as long as the maze itself, which works because indexes refer to mazes weakly
+_INDEXES = weakref.WeakKeyDictionary()
+
+
+class JunctionGraph:
+    """ The junctions and corridors of a rectangular maze, with an index from every cell to its corridor.
+
+    Cell ids are `row * cols + col`, as in `MazeGraph`. The cells of corridor `k` are
+    `corridor_cells[corridor_ptr[k]:corridor_ptr[k + 1]]`, ordered from junction `corridor_ends[k, 0]` to junction
+    `corridor_ends[k, 1]`, with the cost of reaching each from the first junction at the same positions in
+    `corridor_costs`. A corridor between adjacent junctions has no cells.
+
+    The index is rebuilt the next time it is queried after the maze has changed. It holds its maze only weakly, so
+    that the shared indexes of `for_maze` do not keep their mazes alive.
+    """
+
+    def __init__(self, maze: RectangularMaze):
+        self._maze = weakref.ref(maze)
+        self.version = None
+        self.refresh()
+
+    @property
+    def maze(self) -> RectangularMaze:
+        maze = self._maze()
+        if maze is None:
+            raise ReferenceError('The maze of this junction graph no longer exists')
+        return maze
+
+    @classmethod
+    def for_maze(cls, maze: RectangularMaze) -> 'JunctionGraph':
+        """ The shared index of a maze, built the first time it is asked for """
+        index = _INDEXES.get(maze)
+        if index is None:
+            index = _INDEXES[maze] = cls(maze)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.junction_cells)
+
+    @property
+    def is_stale(self) -> bool:
+        return self.version != self.maze.version
+
+    def refresh(self):
+        """ Rebuild the index if the maze has changed since it was built """
+        if self.is_stale:
+            self.version = self.maze.version
+            self._build()
+
+    def _build(self):
+        self.graph = graph = self.maze.freeze()
+        indptr, indices, costs = graph._indptr, graph._indices, graph._costs
+        size = len(graph)
+
+        degree = np.diff(graph.indptr)
+        junction_of = np.full(size, -1, dtype=np.int64)
+        junction_cells = np.flatnonzero(degree != 2).tolist()
+        junction_of[junction_cells] = np.arange(len(junction_cells))
+        corridor_of = np.full(size, -1, dtype=np.int64)
+        offset_of = np.full(size, -1, dtype=np.int64)
+        junction_view, corridor_view, offset_view = memoryview(junction_of), memoryview(corridor_of), memoryview(offset_of)
+
+        corridor_ptr, corridor_cells, corridor_costs = [0], [], []
+        corridor_ends, corridor_lengths = [], []
+        adjacency = [[] for _ in junction_cells]
+
+        def trace(junction_cell, first_cell, cost):
+            """ Follow a corridor out of a junction until it reaches another, recording it as a new edge """
+            corridor = len(corridor_ends)
+            previous, current, total = junction_cell, first_cell, cost
+            offset = 0
+            while junction_view[current] < 0:
+                corridor_view[current] = corridor
+                offset_view[current] = offset
+                corridor_cells.append(current)
+                corridor_costs.append(total)
+                offset += 1
+
+                start = indptr[current]
+                if indices[start] == previous:
+                    previous, current, total = current, indices[start + 1], total + costs[start + 1]
+                else:
+                    previous, current, total = current, indices[start], total + costs[start]
+
+            a, b = junction_view[junction_cell], junction_view[current]
+            corridor_ptr.append(len(corridor_cells))
+            corridor_ends.append((a, b))
+            corridor_lengths.append(total)
+            adjacency[a].append((b, total, corridor, True))
+            adjacency[b].append((a, total, corridor, False))
+
+        for junction_cell in junction_cells:
+            for neighbour, cost in graph.weighted_neighbours(junction_cell):
+                if junction_view[neighbour] >= 0:
+                    if junction_cell <= neighbour:
+                        trace(junction_cell, neighbour, cost)
+                elif corridor_view[neighbour] < 0:
+                    trace(junction_cell, neighbour, cost)
+
+        # Whatever corridor cells are left lie on cycles without a junction, so make one cell of each a junction
+        for cell in np.flatnonzero((degree == 2) & (corridor_of < 0)).tolist():
+            if corridor_view[cell] >= 0:
+                continue
+            junction_view[cell] = len(junction_cells)
+            junction_cells.append(cell)
+            adjacency.append([])
+            trace(cell, indices[indptr[cell]], costs[indptr[cell]])
+
+        self.junction_of = junction_of
+        self.corridor_of = corridor_of
+        self.offset_of = offset_of
+        self.junction_cells = np.array(junction_cells, dtype=np.int64)
+        self.corridor_ptr = np.array(corridor_ptr, dtype=np.int64)
+        self.corridor_cells = np.array(corridor_cells, dtype=np.int64)
+        self.corridor_costs = np.array(corridor_costs, dtype=np.float64)
+        self.corridor_ends = np.array(corridor_ends, dtype=np.int64).reshape(-1, 2)
+        self.corridor_lengths = np.array(corridor_lengths, dtype=np.float64)
+        self.adjacency = adjacency
+        self.has_unit_costs = bool((graph.costs == 1).all())
+        LOG.debug(f'Contracted {size} cells to {len(junction_cells)} junctions and {len(corridor_ends)} corridors')
+
+    def _corridor_position(self, cell: int) -> tuple[int, int, float]:
+        """ The corridor of a corridor cell, its index into `corridor_cells` and the cost to it from the first end """
+        corridor = int(self.corridor_of[cell])
+        position = int(self.corridor_ptr[corridor] + self.offset_of[cell])
+        return corridor, position, float(self.corridor_costs[position])
+
+    def _attachments(self, cell: int) -> list[tuple[int, float, tuple]]:
+        """ The junctions reachable from a cell without passing another, as `(junction, cost, route)`.
+
+        A route is `(corridor, position, towards_end)`, or None when the cell is the junction itself.
+        """
+        if self.junction_of[cell] >= 0:
+            return [(int(self.junction_of[cell]), 0.0, None)]
+        corridor, position, cost = self._corridor_position(cell)
+        first, last = self.corridor_ends[corridor]
+        return [(int(first), cost, (corridor, position, False)),
+                (int(last), float(self.corridor_lengths[corridor]) - cost, (corridor, position, True))]
+
+    def _walk(self, corridor: int, position: int | None, towards_end: bool) -> list[int]:
+        """ The cells of a corridor from `position` (or from the junction at its other end, if None) to one end """
+        begin, end = self.corridor_ptr[corridor], self.corridor_ptr[corridor + 1]
+        if towards_end:
+            return self.corridor_cells[begin if position is None else position:end].tolist()
+        return self.corridor_cells[begin:end if position is None else position + 1][::-1].tolist()
+
+    def _step_cost(self, cell_a: int, cell_b: int) -> float:
+        for neighbour, cost in self.graph.weighted_neighbours(cell_a):
+            if neighbour == cell_b:
+                return cost
+        raise ValueError(f'Cells {cell_a} and {cell_b} are not connected')
+
+    def shortest_path(self, start: Node, finish: Node, *, move_history: list = None,
+                      stats: SearchStats = None) -> tuple[float, list[Node]]:
+        """ Find the cheapest path between two cells by searching the junctions between them.
+
+        Args:
+            start: The cell to leave from
+            finish: The cell to arrive at
+            move_history: Records each junction as it is reached and as it is expanded
+            stats: Counters to add this query to, where each expanded node is a junction
+
+        Returns:
+            The cost of the path, and the cells along it from `start` to `finish`
+        """
+        self.refresh()
+        start_cell, finish_cell = self.graph.node_id(start), self.graph.node_id(finish)
+        if stats is not None:
+            stats.queries += 1
+        if start_cell == finish_cell:
+            return 0.0, [start]
+
+        best_cost, best_junction = float('inf'), None
+        start_corridor, finish_corridor = self.corridor_of[start_cell], self.corridor_of[finish_cell]
+        if start_corridor >= 0 and start_corridor == finish_corridor:
+            best_cost = abs(self._corridor_position(start_cell)[2] - self._corridor_position(finish_cell)[2])
+
+        frontier = PriorityFrontier()
+        cost_to, came_from = {}, {}
+        for junction, cost, route in self._attachments(start_cell):
+            if cost < cost_to.get(junction, float('inf')):
+                cost_to[junction] = cost
+                came_from[junction] = (None, route)
+                frontier.push(junction, cost)
+                if move_history is not None:
+                    move_history.append((self.graph.node_at(int(self.junction_cells[junction])), Moves.Visit))
+        targets = {}
+        for junction, cost, route in self._attachments(finish_cell):
+            if cost < targets.get(junction, (float('inf'), None))[0]:
+                targets[junction] = (cost, route)
+
+        with nullcontext() if stats is None else stats.phase('search'):
+            while frontier:
+                junction, cost = frontier.pop()
+                if cost >= best_cost:
+                    break
+                if stats is not None:
+                    stats.expanded += 1
+                if move_history is not None:
+                    move_history.append((self.graph.node_at(int(self.junction_cells[junction])), Moves.Complete))
+                if junction in targets and cost + targets[junction][0] < best_cost:
+                    best_cost, best_junction = cost + targets[junction][0], junction
+
+                for neighbour, length, corridor, forward in self.adjacency[junction]:
+                    possible_cost = cost + length
+                    if possible_cost < cost_to.get(neighbour, float('inf')):
+                        cost_to[neighbour] = possible_cost
+                        came_from[neighbour] = (junction, (corridor, None, forward))
+                        frontier.push(neighbour, possible_cost)
+                        if move_history is not None:
+                            move_history.append((self.graph.node_at(int(self.junction_cells[neighbour])), Moves.Visit))
+                        if stats is not None:
+                            stats.relaxed += 1
+                            stats.frontier_peak = max(stats.frontier_peak, len(frontier))
+
+            if best_cost == float('inf'):
+                raise RuntimeError(f"Could not find path from {start} to {finish}")
+
+        with nullcontext() if stats is None else stats.phase('reconstruct'):
+            return best_cost, self._expand(start_cell, finish_cell, best_junction, came_from, targets)
+
+    def _expand(self, start_cell: int, finish_cell: int, junction: int | None, came_from: dict,
+                targets: dict) -> list[Node]:
+        """ Turn a route through the junctions back into the cells it passes """
+        if junction is None:
+            # The cells share a corridor, and walking straight along it was cheapest
+            corridor, start_position, _ = self._corridor_position(start_cell)
+            _, finish_position, _ = self._corridor_position(finish_cell)
+            if start_position < finish_position:
+                cells = self.corridor_cells[start_position:finish_position + 1].tolist()
+            else:
+                cells = self.corridor_cells[finish_position:start_position + 1][::-1].tolist()
+        else:
+            legs = []
+            while junction is not None:
+                previous, route = came_from[junction]
+                legs.append((junction, route))
+                junction = previous
+
+            cells = []
+            for junction, route in reversed(legs):
+                if route is not None:
+                    corridor, position, towards_end = route
+                    cells.extend(self._walk(corridor, position, towards_end))
+                cells.append(int(self.junction_cells[junction]))
+
+            _, route = targets[junction]
+            if route is not None:
+                corridor, position, towards_end = route
+                cells.extend(reversed(self._walk(corridor, position, towards_end)))
+        return [self.graph.node_at(cell) for cell in cells]
+
+
+def junction_search(maze: RectangularMaze, start: Node, finish: Node, *, move_history: list = None,
+                    stats: SearchStats = None) -> tuple[dict, list[Node]]:
+    """ Dijkstra's algorithm over the junction graph of the maze, building the index on the first query.
+
+    Only the cells on the path are scored, since the corridors searched are never expanded into cells.
+    """
+    junctions = JunctionGraph.for_maze(maze)
+    cost, path = junctions.shortest_path(start, finish, move_history=move_history, stats=stats)
+
+    if junctions.has_unit_costs:
+        return {node: steps for steps, node in enumerate(path)}, path
+
+    g_score = {start: 0}
+    for node_a, node_b in zip(path, path[1:]):
+        g_score[node_b] = g_score[node_a] + junctions._step_cost(junctions.graph.node_id(node_a),
+                                                                  junctions.graph.node_id(node_b))
+    return g_score, path
@@ -3,13 +3,22 @@ from abc import (
     ABC,
     abstractmethod,
 )
-from enum import Enum
+from collections.abc import Set
+from enum import (
+    Enum,
+    IntEnum,
+)
 
 import numpy as np
 
 rng = np.random.default_rng()
 
 
+def resolve_rng(generator: np.random.Generator | None) -> np.random.Generator:
+    """ The random number generator to draw from, falling back to the module-wide `rng` """
+    return rng if generator is None else generator
+
+
 class Direction(Enum):
     N = 0
     W = 1
@@ -20,6 +29,21 @@ class Direction(Enum):
         return Direction((self.value + 2) % 4)
 
 
+class Moves(IntEnum):
+    """ The events recorded in a `move_history` by the generation and pathfinding algorithms """
+    Visit = 0  # Encounter node
+    Complete = 1  # Finish processing the node
+
+
+def move_history_array(move_history: list) -> np.ndarray:
+    """ A `move_history` as an `(events, 3)` int32 array of the row, column and `Moves` value of each event """
+    history = np.empty((len(move_history), 3), dtype=np.int32)
+    if move_history:
+        history[:, :2] = [node for node, _move in move_history]
+        history[:, 2] = [move for _node, move in move_history]
+    return history
+
+
 DIRECTION_OPS = {
     Direction.N: np.array([-1, 0]),
     Direction.W: np.array([0, -1]),
@@ -27,9 +51,52 @@ DIRECTION_OPS = {
     Direction.E: np.array([0, 1]),
 }
 
+# The same offsets as plain integer pairs, indexed by `Direction.value`, for loops that cannot afford NumPy scalars
+DIRECTION_OFFSETS = tuple((int(DIRECTION_OPS[direction][0]), int(DIRECTION_OPS[direction][1])) for direction in Direction)
+
+# Bit flags used by the packed wall representation, one bit per direction. A set bit means the wall is present
+WALL_BITS = {direction: 1 << direction.value for direction in Direction}
+ALL_WALLS = 0b1111
+
 Node = tuple[int, int]
 
 
+def open_moves(wall_bits: np.ndarray) -> np.ndarray:
+    """ The moves out of every cell, as a `(rows, cols, 4)` bool array indexed by `Direction.value`.
+
+    A move is open where there is no wall, except that no move ever leaves the grid, even where the boundary has no wall.
+    """
+    is_open = np.empty((*wall_bits.shape, 4), dtype=bool)
+    for direction in Direction:
+        is_open[:, :, direction.value] = (wall_bits & WALL_BITS[direction]) == 0
+    is_open[0, :, Direction.N.value] = False
+    is_open[:, 0, Direction.W.value] = False
+    is_open[-1, :, Direction.S.value] = False
+    is_open[:, -1, Direction.E.value] = False
+    return is_open
+
+
+class NodeGrid(Set):
+    """ Read-only set of every node in a rectangular grid, without materialising the node tuples """
+
+    def __init__(self, rows: int, cols: int):
+        self.rows = rows
+        self.cols = cols
+
+    def __contains__(self, node) -> bool:
+        try:
+            row, col = node
+        except (TypeError, ValueError):
+            return False
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def __iter__(self):
+        return ((i, j) for i in range(self.rows) for j in range(self.cols))
+
+    def __len__(self) -> int:
+        return self.rows * self.cols
+
+
 class Maze(ABC):
     node_set: set
 
@@ -37,6 +104,9 @@ class Maze(ABC):
         self.log = logging.getLogger(self.__class__.__name__)
         self.log.setLevel(logging.DEBUG)
 
+        # Bumped by every wall or cost change, so indexes built over the maze can tell when they are stale
+        self.version = 0
+
     @abstractmethod
     def move(self, node: Node, direction: Direction) -> Node:
         raise NotImplementedError
@@ -57,8 +127,17 @@ class Maze(ABC):
     def get_neighbours(self, node: Node) -> list[tuple[Direction, Node]]:
         raise NotImplementedError
 
+    def weighted_neighbours(self, node: Node) -> list[tuple[Node, float]]:
+        """ The neighbours that can be moved to from a node, with the cost of each move """
+        neighbours = []
+        for direction, neighbour in self.get_neighbours(node):
+            cost = self.edge_cost(node, direction)
+            if cost < float('inf'):
+                neighbours.append((neighbour, cost))
+        return neighbours
+
     @abstractmethod
-    def random_node(self) -> Node:
+    def random_node(self, rng: np.random.Generator = None) -> Node:
         raise NotImplementedError
 
     @abstractmethod
@@ -73,21 +152,55 @@ class RectangularMaze(Maze):
         self.rows = dimensions[0]
         self.cols = dimensions[1]
 
-        self.maze_array = np.ones((*dimensions, 4)) * float('inf')
-        self.node_set: set[Node] = set([(i, j) for i in range(self.rows) for j in range(self.cols)])
+        self.allocate()
+        self.node_set = NodeGrid(self.rows, self.cols)
 
         if generation_alg:
             generation_alg(self)
 
+    def allocate(self):
+        """ Create the wall storage, with every wall present """
+        self.maze_array = np.ones((self.rows, self.cols, 4)) * float('inf')
+
     @classmethod
     def blank_maze(cls, dimensions):
         inst = cls(dimensions)
         inst.maze_array = np.zeros((*dimensions, 4))
         return inst
 
+    @classmethod
+    def from_wall_bits(cls, wall_bits: np.ndarray):
+        inst = cls(wall_bits.shape)
+        inst.set_wall_bits(wall_bits)
+        return inst
+
+    def wall_bits(self) -> np.ndarray:
+        """ The walls as a `(rows, cols)` uint8 array of `WALL_BITS` flags """
+        walls = self.maze_array == float('inf')
+        return (walls * np.array([WALL_BITS[direction] for direction in Direction], dtype=np.uint8)).sum(
+            axis=2, dtype=np.uint8)
+
+    def set_wall_bits(self, wall_bits: np.ndarray):
+        """ Replace every wall from a `(rows, cols)` array of `WALL_BITS` flags. Open edges are given unit cost """
+        flags = np.array([WALL_BITS[direction] for direction in Direction], dtype=np.uint8)
+        self.maze_array = np.where(wall_bits[:, :, np.newaxis] & flags, float('inf'), 1.0)
+        self.version += 1
+
+    @property
+    def has_unit_costs(self) -> bool:
+        return bool(((self.maze_array == 1) | (self.maze_array == float('inf'))).all())
+
+    def edge_costs(self) -> np.ndarray:
+        """ The cost of every edge as a `(rows, cols, 4)` array indexed by `Direction.value`, infinite for walls """
+        return self.maze_array
+
+    def freeze(self) -> 'MazeGraph':
+        """ Compile a snapshot of the maze into a `MazeGraph`, which later wall changes will not affect """
+        return MazeGraph.from_maze(self)
+
     def move(self, node: Node, direction: Direction) -> Node:
-        row, col = np.array(node) + DIRECTION_OPS[direction]
-        return int(row), int(col)
+        d_row, d_col = DIRECTION_OFFSETS[direction.value]
+        return node[0] + d_row, node[1] + d_col
 
     def edge_cost(self, node: Node, direction: Direction) -> float:
         return self.maze_array[*node, direction.value]
@@ -99,20 +212,180 @@ class RectangularMaze(Maze):
         if isinstance(direction, (int, np.int64)):
             direction = Direction(direction)
         self.maze_array[*node, direction.value] = 1
+        self.version += 1
 
         dest_node = self.move(node, direction)
-        if all(coord >= 0 for coord in dest_node):
+        if dest_node in self.node_set:
             self.maze_array[*dest_node, direction.flip().value] = 1
 
+    def set_edge_cost(self, node: Node, direction: Direction, cost: float):
+        """ Set the cost of moving between a node and its neighbour, in both directions. An infinite cost is a wall """
+        if isinstance(direction, (int, np.int64)):
+            direction = Direction(direction)
+        self.maze_array[*node, direction.value] = cost
+        self.version += 1
+
+        dest_node = self.move(node, direction)
+        if dest_node in self.node_set:
+            self.maze_array[*dest_node, direction.flip().value] = cost
+
     def get_neighbours(self, node: Node) -> list[tuple[Direction, Node]]:
         possible_nodes = [(direction, self.move(node, direction)) for direction in Direction]
         return [(direction, node) for direction, node in possible_nodes if node in self.node_set]
 
-    def random_node(self) -> Node:
-        row, col = tuple(rng.integers((self.rows, self.cols), size=2))
+    def random_node(self, rng: np.random.Generator = None) -> Node:
+        row, col = tuple(resolve_rng(rng).integers((self.rows, self.cols), size=2))
         return int(row), int(col)
 
     def find_distance(self, node_a: Node, node_b: Node) -> float:
         if node_a not in self.node_set or node_b not in self.node_set:
             self.log.warning(f'Invalid node input: {node_a}, {node_b}')
         return np.abs(np.array(node_a) - np.array(node_b)).sum()
+
+
+class CompactRectangularMaze(RectangularMaze):
+    """ A rectangular maze storing one byte of `WALL_BITS` flags per cell.
+
+    Every open edge costs 1 until a non-unit cost is set, at which point a float cost layer is allocated.
+    """
+
+    def allocate(self):
+        self.walls = np.full((self.rows, self.cols), ALL_WALLS, dtype=np.uint8)
+        self.cost_layer: np.ndarray | None = None
+
+    @classmethod
+    def blank_maze(cls, dimensions):
+        inst = cls(dimensions)
+        inst.walls[:] = 0
+        return inst
+
+    @classmethod
+    def from_wall_bits(cls, wall_bits: np.ndarray, cost_layer: np.ndarray = None):
+        """ Wrap an existing wall array (and optional cost layer) without copying it """
+        inst = cls.__new__(cls)
+        Maze.__init__(inst)
+        inst.rows, inst.cols = wall_bits.shape
+        inst.walls = wall_bits
+        inst.cost_layer = cost_layer
+        inst.node_set = NodeGrid(inst.rows, inst.cols)
+        return inst
+
+    def wall_bits(self) -> np.ndarray:
+        return self.walls
+
+    def set_wall_bits(self, wall_bits: np.ndarray):
+        self.walls[:] = wall_bits
+        self.version += 1
+
+    @property
+    def has_unit_costs(self) -> bool:
+        return self.cost_layer is None
+
+    def edge_costs(self) -> np.ndarray:
+        flags = np.array([WALL_BITS[direction] for direction in Direction], dtype=np.uint8)
+        costs = 1.0 if self.cost_layer is None else self.cost_layer
+        return np.where(self.walls[:, :, np.newaxis] & flags, float('inf'), costs)
+
+    def edge_cost(self, node: Node, direction: Direction) -> float:
+        if self.walls[node] & WALL_BITS[direction]:
+            return float('inf')
+        if self.cost_layer is None:
+            return 1.0
+        return float(self.cost_layer[*node, direction.value])
+
+    def is_wall(self, node: Node, direction: Direction) -> bool:
+        return bool(self.walls[node] & WALL_BITS[direction])
+
+    def remove_wall(self, node: Node, direction: Direction):
+        if isinstance(direction, (int, np.integer)):
+            direction = Direction(direction)
+        if self.cost_layer is not None:
+            self.set_edge_cost(node, direction, 1.0)
+            return
+
+        self.walls[node] &= ALL_WALLS ^ WALL_BITS[direction]
+        self.version += 1
+        dest_node = self.move(node, direction)
+        if dest_node in self.node_set:
+            self.walls[dest_node] &= ALL_WALLS ^ WALL_BITS[direction.flip()]
+
+    def set_edge_cost(self, node: Node, direction: Direction, cost: float):
+        if isinstance(direction, (int, np.integer)):
+            direction = Direction(direction)
+        dest_node = self.move(node, direction)
+        edges = [(node, direction)]
+        if dest_node in self.node_set:
+            edges.append((dest_node, direction.flip()))
+
+        if cost != 1 and cost != float('inf') and self.cost_layer is None:
+            self.cost_layer = np.ones((self.rows, self.cols, 4))
+        self.version += 1
+
+        for edge_node, edge_direction in edges:
+            if cost == float('inf'):
+                self.walls[edge_node] |= WALL_BITS[edge_direction]
+            else:
+                self.walls[edge_node] &= ALL_WALLS ^ WALL_BITS[edge_direction]
+            if self.cost_layer is not None:
+                self.cost_layer[*edge_node, edge_direction.value] = cost
+
+
+class MazeGraph:
+    """ A compressed sparse row adjacency graph compiled from a rectangular maze, for solver hot loops.
+
+    Node ids are `row * cols + col`. The open neighbours of node `i` are `indices[indptr[i]:indptr[i + 1]]`, in
+    `Direction` order, with the cost of each move at the same positions in `costs`. The solvers in `pathfinding` accept
+    a graph in place of a maze, and convert between ids and nodes only at their inputs and outputs.
+    """
+
+    def __init__(self, rows: int, cols: int, indptr: np.ndarray, indices: np.ndarray, costs: np.ndarray):
+        self.rows = rows
+        self.cols = cols
+        self.indptr = indptr
+        self.indices = indices
+        self.costs = costs
+
+        # Memoryviews hand the hot loop plain Python numbers without copying the arrays into lists
+        self._indptr = memoryview(indptr)
+        self._indices = memoryview(indices)
+        self._costs = memoryview(costs)
+
+    @classmethod
+    def from_maze(cls, maze: RectangularMaze) -> 'MazeGraph':
+        rows, cols = maze.rows, maze.cols
+        is_open = open_moves(maze.wall_bits()).reshape(-1, 4)
+
+        id_dtype = np.int32 if rows * cols < 2 ** 31 else np.int64
+        offsets = np.array([d_row * cols + d_col for d_row, d_col in DIRECTION_OFFSETS], dtype=id_dtype)
+        node_ids = np.arange(rows * cols, dtype=id_dtype)
+
+        indptr = np.zeros(rows * cols + 1, dtype=np.int64)
+        np.cumsum(is_open.sum(axis=1), out=indptr[1:])
+        indices = (node_ids[:, np.newaxis] + offsets)[is_open]
+        if maze.has_unit_costs:
+            costs = np.ones(indices.size)
+        else:
+            costs = np.ascontiguousarray(maze.edge_costs().reshape(-1, 4)[is_open], dtype=np.float64)
+        return cls(rows, cols, indptr, indices, costs)
+
+    def __len__(self) -> int:
+        return self.rows * self.cols
+
+    def node_id(self, node: Node) -> int:
+        row, col = node
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise KeyError(f'Node {node} is outside the {self.rows}x{self.cols} graph')
+        return row * self.cols + col
+
+    def node_at(self, node_id: int) -> Node:
+        return divmod(node_id, self.cols)
+
+    def weighted_neighbours(self, node_id: int):
+        """ The `(node_id, cost)` pairs that can be moved to from a node """
+        start, end = self._indptr[node_id], self._indptr[node_id + 1]
+        return zip(self._indices[start:end], self._costs[start:end])
+
+    def find_distance(self, node_a: int, node_b: int) -> float:
+        row_a, col_a = divmod(node_a, self.cols)
+        row_b, col_b = divmod(node_b, self.cols)
+        return abs(row_a - row_b) + abs(col_a - col_b)
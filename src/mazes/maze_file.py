@@ -0,0 +1,177 @@
+""" A versioned binary `.maze` format, laid out so the wall bits can be memory-mapped straight into a maze.
+
+Layout, little-endian:
+    64 byte header: magic, version, topology, flags, rows, cols, seed and algorithm name (see `HEADER_FORMAT`)
+    rows * cols bytes of `WALL_BITS`, one per cell in row-major order
+    An optional float64 `(rows, cols, 4)` cost layer, starting at the next multiple of 8 bytes
+"""
+import logging
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.mazes.maze import (
+    CompactRectangularMaze,
+    RectangularMaze,
+)
+
+LOG = logging.getLogger('MazeFile')
+LOG.setLevel(logging.INFO)
+
+MAGIC = b'MAZE'
+VERSION = 1
+HEADER_FORMAT = '<4sHBBQQQ32s'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+TOPOLOGY_RECTANGULAR = 0
+
+FLAG_COST_LAYER = 1 << 0
+FLAG_SEED = 1 << 1
+
+
+@dataclass(frozen=True)
+class MazeHeader:
+    rows: int
+    cols: int
+    topology: int = TOPOLOGY_RECTANGULAR
+    seed: int | None = None
+    algorithm: str = ''
+    has_cost_layer: bool = False
+    version: int = VERSION
+
+    def __post_init__(self):
+        if self.seed is not None and not 0 <= self.seed < 2 ** 64:
+            raise ValueError(f'The seed must be an unsigned 64-bit integer to be stored in the header, got {self.seed}')
+
+    @property
+    def walls_offset(self) -> int:
+        return HEADER_SIZE
+
+    @property
+    def cost_layer_offset(self) -> int:
+        walls_end = self.walls_offset + self.rows * self.cols
+        return -(-walls_end // 8) * 8
+
+    def pack(self) -> bytes:
+        flags = (FLAG_COST_LAYER if self.has_cost_layer else 0) | (FLAG_SEED if self.seed is not None else 0)
+        algorithm = self.algorithm.encode('utf-8')
+        if len(algorithm) > 32:
+            raise ValueError(f'Algorithm name is longer than 32 bytes: {self.algorithm}')
+        return struct.pack(HEADER_FORMAT, MAGIC, self.version, self.topology, flags, self.rows, self.cols,
+                           self.seed or 0, algorithm)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> 'MazeHeader':
+        if len(data) < HEADER_SIZE:
+            raise ValueError('File is too short to hold a maze header')
+        magic, version, topology, flags, rows, cols, seed, algorithm = struct.unpack(HEADER_FORMAT, data[:HEADER_SIZE])
+        if magic != MAGIC:
+            raise ValueError(f'Not a maze file, found magic {magic!r}')
+        if version > VERSION:
+            raise ValueError(f'Unsupported maze file version {version}, expected at most {VERSION}')
+        if topology != TOPOLOGY_RECTANGULAR:
+            raise ValueError(f'Unsupported maze topology {topology}')
+        return cls(rows=rows, cols=cols, topology=topology, seed=seed if flags & FLAG_SEED else None,
+                   algorithm=algorithm.rstrip(b'\0').decode('utf-8'), has_cost_layer=bool(flags & FLAG_COST_LAYER),
+                   version=version)
+
+
+def read_header(path) -> MazeHeader:
+    with open(path, 'rb') as f:
+        return MazeHeader.unpack(f.read(HEADER_SIZE))
+
+
+def save_maze(maze: RectangularMaze, path, *, seed: int = None, algorithm: str = ''):
+    """ Write a rectangular maze, including a cost layer if it has any non-unit edge costs """
+    if isinstance(maze, CompactRectangularMaze):
+        cost_layer = maze.cost_layer
+    else:
+        cost_layer = None if maze.has_unit_costs else maze.maze_array
+    header = MazeHeader(maze.rows, maze.cols, seed=seed, algorithm=algorithm, has_cost_layer=cost_layer is not None)
+    # Packed before the file is opened, so a header that can not be written leaves any existing file untouched
+    header_bytes = header.pack()
+
+    with open(path, 'wb') as f:
+        f.write(header_bytes)
+        f.write(np.ascontiguousarray(maze.wall_bits(), dtype=np.uint8).tobytes())
+        if cost_layer is not None:
+            f.write(b'\0' * (header.cost_layer_offset - f.tell()))
+            f.write(np.ascontiguousarray(cost_layer, dtype='<f8').tobytes())
+    LOG.info(f'Saved {maze.rows}x{maze.cols} maze to {path}')
+
+
+def load_maze(path, mode: str = 'r') -> tuple[CompactRectangularMaze, MazeHeader]:
+    """ Open a maze file without reading it, memory-mapping its walls so they are only paged in as they are used.
+
+    Args:
+        path: The `.maze` file
+        mode: The `np.memmap` mode. 'r' is read-only, 'r+' writes wall changes back to the file and 'c' keeps them in
+            memory only
+
+    Returns:
+        The maze, backed by the file, and the file's header
+    """
+    header = read_header(path)
+    walls = np.memmap(path, dtype=np.uint8, mode=mode, offset=header.walls_offset, shape=(header.rows, header.cols))
+    cost_layer = None
+    if header.has_cost_layer:
+        cost_layer = np.memmap(path, dtype='<f8', mode=mode, offset=header.cost_layer_offset,
+                               shape=(header.rows, header.cols, 4))
+    return CompactRectangularMaze.from_wall_bits(walls, cost_layer), header
+
+
+class MazeWriter:
+    """ Stream a maze to a file row by row, for generators that never hold the whole maze in memory.
+
+    The writer is also a binary file-like sink, so it can be passed straight to `maze_generation.stream_ellers`.
+    """
+
+    def __init__(self, path, dimensions: tuple[int, int], *, seed: int = None, algorithm: str = ''):
+        self.path = path
+        self.header = MazeHeader(*dimensions, seed=seed, algorithm=algorithm)
+        header_bytes = self.header.pack()
+        self.rows_written = 0
+        self._partial_row = b''
+        self._file = open(path, 'wb')
+        self._file.write(header_bytes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def write_rows(self, wall_bits: np.ndarray):
+        """ Append one `(cols,)` row, or a `(rows, cols)` block of rows, of `WALL_BITS` """
+        wall_bits = np.asarray(wall_bits, dtype=np.uint8)
+        if wall_bits.shape[-1] != self.header.cols:
+            raise ValueError(f'Expected rows of {self.header.cols} cells, got shape {wall_bits.shape}')
+        self.write(wall_bits.tobytes())
+
+    def write(self, data: bytes) -> int:
+        """ Append raw `WALL_BITS` bytes, which need not end on a row boundary
+
+        Returns:
+            The number of bytes passed in, as for any binary file-like sink
+        """
+        written = bytes(data)
+        data = self._partial_row + written
+        rows, remainder = divmod(len(data), self.header.cols) if self.header.cols else (0, 0)
+        if self.rows_written + rows > self.header.rows:
+            raise ValueError(f'Writing more than the {self.header.rows} rows declared for {self.path}')
+
+        whole = len(data) - remainder
+        self._file.write(data[:whole])
+        self._partial_row = data[whole:]
+        self.rows_written += rows
+        return len(written)
+
+    def close(self):
+        self._file.close()
+        if self.rows_written != self.header.rows or self._partial_row:
+            raise ValueError(f'Only {self.rows_written} of {self.header.rows} rows were written to {self.path}')
+        LOG.info(f'Streamed {self.header.rows}x{self.header.cols} maze to {self.path}')
@@ -1,168 +1,518 @@
+import heapq
+import itertools
 import logging
-from enum import IntEnum
 
 import numpy as np
 
 from src.mazes.maze import (
+    ALL_WALLS,
+    DIRECTION_OFFSETS,
+    WALL_BITS,
     Direction,
     Maze,
-    rng,
+    Moves,
+    resolve_rng,
 )
 
 LOG = logging.getLogger('MazeGeneration')
 LOG.setLevel(logging.DEBUG)
 
 
-class Moves(IntEnum):
-    Visit = 0  # Encounter node
-    Complete = 1  # Finish processing the node
+_NEIGHBOUR_OFFSETS = tuple((direction, *DIRECTION_OFFSETS[direction.value]) for direction in Direction)
 
+# Every ordering of the four neighbour offsets, so that a shuffle costs one random index
+_DIRECTION_ORDERS = tuple(itertools.permutations(_NEIGHBOUR_OFFSETS))
 
-def _is_visited(maze, node):
-    return (maze.maze_array[*node, :] < float('inf')).any()
 
+def _shuffled_directions(rng: np.random.Generator):
+    """ Endless stream of random direction orderings, drawing from the RNG in batches """
+    while True:
+        for index in rng.integers(len(_DIRECTION_ORDERS), size=4096).tolist():
+            yield _DIRECTION_ORDERS[index]
 
-def recursive_backtrack(maze, current_node=None, *, loop_chance: float = 0.0, move_history: list = None):
-    LOG.debug('Creating maze using `recursive_backtrack`')
-    if current_node is None:
-        current_node = maze.random_node()
-    LOG.debug(f'Visiting node: {current_node}')
-    if move_history:
+
+def _backtrack_recurse(maze: Maze, current_node, visited: bytearray, orders, loop_chance: float, move_history: list,
+                       rng: np.random.Generator):
+    if move_history is not None:
         move_history.append((current_node, Moves.Visit))
 
-    directions = np.array(Direction)
-    rng.shuffle(directions)
-    for direction in directions:
-        next_node = maze.move(current_node, direction)
-        if next_node in maze.node_set:  # Is it a legal node?
-            # Is it an unvisited node, or should we randomly add a loop?
-            if not _is_visited(maze, next_node) or rng.random() < loop_chance:
+    row, col = current_node
+    for direction, d_row, d_col in next(orders):
+        next_row, next_col = row + d_row, col + d_col
+        if 0 <= next_row < maze.rows and 0 <= next_col < maze.cols:  # Is it a legal node?
+            index = next_row * maze.cols + next_col
+            if not visited[index]:
+                visited[index] = 1
+                maze.remove_wall(current_node, direction)
+                _backtrack_recurse(maze, (next_row, next_col), visited, orders, loop_chance, move_history, rng)
+            elif loop_chance and rng.random() < loop_chance:  # Randomly add a loop to a visited node
                 maze.remove_wall(current_node, direction)
-                recursive_backtrack(maze, next_node, move_history=move_history)
-    if move_history:
+
+    if move_history is not None:
         move_history.append((current_node, Moves.Complete))
 
 
-def iterative_backtrack(maze: Maze, loop_chance: float = 0.0, move_history: list = None):
+def recursive_backtrack(maze, current_node=None, *, loop_chance: float = 0.0, move_history: list = None,
+                        rng: np.random.Generator = None):
+    LOG.info('Creating maze using `recursive_backtrack`')
+    rng = resolve_rng(rng)
+    if current_node is None:
+        current_node = maze.random_node(rng)
+
+    visited = bytearray(maze.rows * maze.cols)
+    visited[current_node[0] * maze.cols + current_node[1]] = 1
+    _backtrack_recurse(maze, current_node, visited, _shuffled_directions(rng), loop_chance, move_history, rng)
+
+
+def iterative_backtrack(maze: Maze, loop_chance: float = 0.0, move_history: list = None, *,
+                        rng: np.random.Generator = None):
     LOG.info('Creating maze using `iterative_backtrack`')
-    current_node = maze.random_node()
+    rng = resolve_rng(rng)
+    rows, cols = maze.rows, maze.cols
+    visited = bytearray(rows * cols)
+    orders = _shuffled_directions(rng)
+
+    current_node = maze.random_node(rng)
+    visited[current_node[0] * cols + current_node[1]] = 1
+    if move_history is not None:
+        move_history.append((current_node, Moves.Visit))
     move_stack = [current_node]
-    directions = np.array(Direction)
 
     while move_stack:
-        LOG.debug(f'Visiting node: {current_node}')
-        if move_history:
-            move_history.append((current_node, Moves.Visit))
-
-        rng.shuffle(directions)
-        for direction in directions:
-            next_node = maze.move(current_node, direction)
-            if next_node in maze.node_set:  # Is it a legal node?
-                # Is it an unvisited node, or should we randomly add a loop?
-                if not _is_visited(maze, next_node) or rng.random() < loop_chance:
+        row, col = current_node
+        for direction, d_row, d_col in next(orders):
+            next_row, next_col = row + d_row, col + d_col
+            if 0 <= next_row < rows and 0 <= next_col < cols:  # Is it a legal node?
+                index = next_row * cols + next_col
+                if not visited[index]:
+                    visited[index] = 1
                     maze.remove_wall(current_node, direction)
                     move_stack.append(current_node)
-                    current_node = next_node
+                    current_node = next_row, next_col
+                    if move_history is not None:
+                        move_history.append((current_node, Moves.Visit))
                     break
+                elif loop_chance and rng.random() < loop_chance:  # Randomly add a loop to a visited node
+                    maze.remove_wall(current_node, direction)
         else:  # Didn't break, backtrack
-            current_node = move_stack.pop()
-            if move_history:
+            if move_history is not None:
                 move_history.append((current_node, Moves.Complete))
+            current_node = move_stack.pop()
+
+
+def ellers_rows(rows: int, cols: int, *, loop_chance: float = 0.0, rng: np.random.Generator = None):
+    """ Eller's algorithm, generating a maze one row at a time while holding only the current row in memory.
+
+    Once the walls of the perfect maze are settled, each wall it leaves is removed with probability `loop_chance`, so
+    the extra passages are never seen by the sets and do not change the maze they are added to.
+
+    Yields:
+        A `(cols,)` uint8 array of `WALL_BITS` flags for each finished row, from top to bottom
+    """
+    rng = resolve_rng(rng)
+    sets = np.full(cols, -1, dtype=np.int64)
+    north_open = np.zeros(cols, dtype=bool)
+
+    for row in range(rows):
+        last_row = row == rows - 1
+
+        # Cells that were not joined from above start in a set of their own
+        is_new = sets < 0
+        sets[is_new] = np.setdiff1d(np.arange(cols), sets[~is_new])[:is_new.sum()]
+
+        # Randomly join neighbouring cells of different sets, or every pair on the last row
+        merged_into = list(range(cols))
+
+        def find(label):
+            while merged_into[label] != label:
+                merged_into[label] = label = merged_into[merged_into[label]]
+            return label
+
+        east_open = np.zeros(cols, dtype=bool)
+        joins = (rng.random(cols - 1) < 0.5).tolist()
+        loops = rng.random(cols - 1) < loop_chance
+        row_sets = sets.tolist()
+        for col in range(cols - 1):
+            set_a, set_b = find(row_sets[col]), find(row_sets[col + 1])
+            if set_a != set_b and (last_row or joins[col]):
+                east_open[col] = True
+                merged_into[set_b] = set_a
+        sets = np.array([find(label) for label in row_sets], dtype=np.int64)
+        east_open[:-1] |= loops
+
+        wall_bits = np.full(cols, ALL_WALLS, dtype=np.uint8)
+        wall_bits[north_open] &= ALL_WALLS ^ WALL_BITS[Direction.N]
+        wall_bits[:-1][east_open[:-1]] &= ALL_WALLS ^ WALL_BITS[Direction.E]
+        wall_bits[1:][east_open[:-1]] &= ALL_WALLS ^ WALL_BITS[Direction.W]
+
+        if not last_row:
+            # Randomly carve down, making sure every set continues through one random member at least
+            south_open = rng.random(cols) < 0.5
+            shuffled = rng.permutation(cols)
+            _, first_seen = np.unique(sets[shuffled], return_index=True)
+            representatives = shuffled[first_seen]
+            continues = np.bincount(sets, weights=south_open, minlength=cols) > 0
+            south_open[representatives[~continues[sets[representatives]]]] = True
+            sets = np.where(south_open, sets, -1)
+            if loop_chance:
+                south_open |= rng.random(cols) < loop_chance
+
+            wall_bits[south_open] &= ALL_WALLS ^ WALL_BITS[Direction.S]
+            north_open = south_open
+
+        yield wall_bits
+
+
+def stream_ellers(dimensions: tuple[int, int], sink, *, loop_chance: float = 0.0, rng: np.random.Generator = None):
+    """ Write an Eller's maze of any height to a binary file-like sink, one row of `WALL_BITS` bytes at a time """
+    for wall_bits in ellers_rows(*dimensions, loop_chance=loop_chance, rng=rng):
+        sink.write(wall_bits.tobytes())
+
+
+def ellers(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+           rng: np.random.Generator = None):
+    LOG.info('Creating maze using `ellers`')
+    wall_bits = maze.wall_bits()
+    for row, row_bits in enumerate(ellers_rows(maze.rows, maze.cols, loop_chance=loop_chance, rng=rng)):
+        wall_bits[row] = row_bits
+        if move_history is not None:
+            move_history.extend(((row, col), Moves.Visit) for col in range(maze.cols))
+    maze.set_wall_bits(wall_bits)
+
+
+class DisjointSet:
+    """ Union-find over the integers `0..size-1`, with path compression and union by rank.
+
+    The forest is held in NumPy arrays so its memory is fixed up front, and accessed through memoryviews so the hot
+    loop works with plain Python integers.
+    """
+
+    def __init__(self, size: int):
+        self.parent = np.arange(size, dtype=np.int32 if size < 2 ** 31 else np.int64)
+        self.rank = np.zeros(size, dtype=np.uint8)
+        self._parent = memoryview(self.parent)
+        self._rank = memoryview(self.rank)
+
+    def find(self, item: int) -> int:
+        parent = self._parent
+        root = item
+        while (next_item := parent[root]) != root:
+            root = next_item
+        while (next_item := parent[item]) != root:  # Compress the path behind us
+            parent[item] = root
+            item = next_item
+        return root
+
+    def union(self, item_a: int, item_b: int) -> bool:
+        """ Merge the sets containing two items, returning False if they were already in the same set """
+        root_a, root_b = self.find(item_a), self.find(item_b)
+        if root_a == root_b:
+            return False
+
+        rank = self._rank
+        if rank[root_a] < rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        if rank[root_a] == rank[root_b]:
+            rank[root_a] += 1
+        return True
+
+
+def _open_walls(maze: Maze, east_cells: np.ndarray, south_cells: np.ndarray):
+    """ Open many walls at once, given the flat ids of the cells whose east or south wall should be removed """
+    wall_bits = maze.wall_bits()
+    flat_bits = wall_bits.reshape(-1)
+    flat_bits[east_cells] &= ALL_WALLS ^ WALL_BITS[Direction.E]
+    flat_bits[east_cells + 1] &= ALL_WALLS ^ WALL_BITS[Direction.W]
+    flat_bits[south_cells] &= ALL_WALLS ^ WALL_BITS[Direction.S]
+    flat_bits[south_cells + maze.cols] &= ALL_WALLS ^ WALL_BITS[Direction.N]
+    maze.set_wall_bits(wall_bits)
+
+
+def kruskals(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+             rng: np.random.Generator = None):
+    LOG.info('Creating maze using `kruskals`')
+    rng = resolve_rng(rng)
+    rows, cols = maze.rows, maze.cols
+
+    # Number the interior walls: the east walls of every column but the last, then the south walls of every row but
+    #  the last. A single permutation of those numbers is the order the walls are considered in
+    east_count = rows * (cols - 1)
+    edges = rng.permutation(east_count + (rows - 1) * cols)
+    is_east = edges < east_count
+    cells_a = np.where(is_east, edges // max(cols - 1, 1) * cols + edges % max(cols - 1, 1), edges - east_count)
+    cells_b = cells_a + np.where(is_east, 1, cols)
+
+    carved = np.zeros(edges.size, dtype=bool)
+    sets = DisjointSet(rows * cols)
+    unions_left = rows * cols - 1
+    chunk_size = 1 << 16
+    for chunk_start in range(0, edges.size, chunk_size):
+        if not unions_left:
+            break
+        chunk = zip(cells_a[chunk_start:chunk_start + chunk_size].tolist(),
+                    cells_b[chunk_start:chunk_start + chunk_size].tolist())
+        for i, (cell_a, cell_b) in enumerate(chunk, chunk_start):
+            if sets.union(cell_a, cell_b):
+                carved[i] = True
+                unions_left -= 1
+                if move_history is not None:
+                    move_history.append((divmod(cell_a, cols), Moves.Visit))
+                    move_history.append((divmod(cell_b, cols), Moves.Visit))
+                if not unions_left:
+                    break
+
+    if loop_chance:  # Re-admit a fraction of the rejected walls
+        carved |= rng.random(edges.size) < loop_chance
+
+    _open_walls(maze, cells_a[carved & is_east], cells_a[carved & ~is_east])
+
+
+def _random_directions(rng: np.random.Generator):
+    """ Endless stream of uniformly random `Direction` values, drawing from the RNG in batches """
+    while True:
+        yield from rng.integers(4, size=4096).tolist()
+
+
+def _random_floats(rng: np.random.Generator):
+    """ Endless stream of uniform floats in [0, 1), drawing from the RNG in batches """
+    while True:
+        yield from rng.random(4096).tolist()
+
+
+def _grow_prims(maze: Maze, push, pop, loop_chance: float, move_history: list, rng: np.random.Generator):
+    """ Grow a spanning tree outward from a random node, taking walls from a frontier until it is empty.
+
+    Args:
+        maze: The maze to carve
+        push: Adds a `(row, col, direction)` wall of the tree to the frontier
+        pop: Removes and returns a wall from the frontier, or None once it is empty
+        loop_chance: The chance of opening a wall between two nodes that are already in the tree
+        move_history: Records each node as it joins the tree
+        rng: The random number generator to draw from
+    """
+    rows, cols = maze.rows, maze.cols
+    visited = bytearray(rows * cols)
+
+    def visit(row, col):
+        visited[row * cols + col] = 1
+        if move_history is not None:
+            move_history.append(((row, col), Moves.Visit))
+        for direction, d_row, d_col in _NEIGHBOUR_OFFSETS:
+            next_row, next_col = row + d_row, col + d_col
+            if 0 <= next_row < rows and 0 <= next_col < cols and not visited[next_row * cols + next_col]:
+                push(row, col, direction.value)
+
+    visit(*maze.random_node(rng))
+    while (wall := pop()) is not None:
+        row, col, direction = wall
+        d_row, d_col = DIRECTION_OFFSETS[direction]
+        next_row, next_col = row + d_row, col + d_col
+        if visited[next_row * cols + next_col]:
+            if loop_chance and rng.random() < loop_chance:
+                maze.remove_wall((row, col), direction)
             continue
+        maze.remove_wall((row, col), direction)
+        visit(next_row, next_col)
 
 
-def ellers(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
-    pass
+def prims(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+          rng: np.random.Generator = None):
+    """ Randomised Prim's, taking the frontier wall with the lowest random weight from a heap """
+    LOG.info('Creating maze using `prims`')
+    rng = resolve_rng(rng)
+    frontier = []
+    weights = _random_floats(rng)
 
+    def push(row, col, direction):
+        heapq.heappush(frontier, (next(weights), row, col, direction))
 
-def kruskals(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
-    pass
+    def pop():
+        return heapq.heappop(frontier)[1:] if frontier else None
 
+    _grow_prims(maze, push, pop, loop_chance, move_history, rng)
 
-def prims(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
-    LOG.info('Creating maze using `prims`')
-    current_node = maze.random_node()
-    frontier_set = {(current_node, direction): rng.random() for direction, _ in maze.get_neighbours(current_node)}
-    visited_set = {current_node}
 
-    while frontier_set:
-        wall = min(frontier_set, key=lambda w: frontier_set[w])
-        del frontier_set[wall]
+def simplified_prims(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+                     rng: np.random.Generator = None):
+    """ Simplified Prim's, taking a uniformly random wall from an unordered frontier """
+    LOG.info('Creating maze using `simplified_prims`')
+    rng = resolve_rng(rng)
+    frontier = []
+    picks = _random_floats(rng)
 
-        current_node = maze.move(*wall)
-        if current_node in visited_set:
-            continue
-        LOG.debug(f'Visiting {current_node}')
-        maze.remove_wall(*wall)
-        visited_set.add(current_node)
+    def pop():
+        if not frontier:
+            return None
+        # Swap the chosen wall to the end so it can be removed in constant time
+        index = int(next(picks) * len(frontier))
+        frontier[index], frontier[-1] = frontier[-1], frontier[index]
+        return frontier.pop()
 
-        for direction, _ in maze.get_neighbours(current_node):
-            frontier_set[(current_node, direction)] = rng.random()
+    _grow_prims(maze, lambda *wall: frontier.append(wall), pop, loop_chance, move_history, rng)
 
 
-def recursive_divison(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
+def recursive_divison(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+                      rng: np.random.Generator = None):
     pass
 
 
-def aldous_broder(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
+def aldous_broder(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+                  rng: np.random.Generator = None):
     pass
 
 
-def wilsons(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
-    # TODO: Tidy up function
+def wilsons(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+            rng: np.random.Generator = None):
     LOG.info('Creating maze using `wilsons`')
-    directions = np.array(Direction)
+    rng = resolve_rng(rng)
+    rows, cols = maze.rows, maze.cols
+    size = rows * cols
+
+    # The unvisited cells occupy the first `remaining` slots of `cells`, and `slots` gives the slot of every cell, so
+    #  an unvisited cell can be picked at random or removed in constant time
+    cells = memoryview(np.arange(size, dtype=np.int64))
+    slots = memoryview(np.arange(size, dtype=np.int64))
+    remaining = size
+
+    def mark_visited(cell):
+        nonlocal remaining
+        remaining -= 1
+        slot, last = slots[cell], cells[remaining]
+        cells[slot], slots[last] = last, slot
+        cells[remaining], slots[cell] = cell, remaining
+
+    # The direction of the walk's most recent exit from each cell, overwriting it erases any loop through the cell
+    exits = bytearray(size)
+    picks = _random_floats(rng)
+    steps = _random_directions(rng)
+
+    root = int(next(picks) * size)
+    mark_visited(root)
+    if move_history is not None:
+        move_history.append((divmod(root, cols), Moves.Visit))
+    while remaining:
+        walk_start = cell = cells[int(next(picks) * remaining)]
+
+        while slots[cell] < remaining:  # Walk randomly until reaching a visited cell
+            row, col = divmod(cell, cols)
+            while True:
+                direction = next(steps)
+                d_row, d_col = DIRECTION_OFFSETS[direction]
+                next_row, next_col = row + d_row, col + d_col
+                if 0 <= next_row < rows and 0 <= next_col < cols:  # Is it a legal node?
+                    break
+            exits[cell] = direction
+            cell = next_row * cols + next_col
 
-    walk_root = maze.random_node()
-    visited_set = {walk_root}
-    LOG.debug(f'Starting at {walk_root}')
+        cell = walk_start
+        while slots[cell] < remaining:  # Carve the loop-erased walk into the maze
+            row, col = divmod(cell, cols)
+            direction = exits[cell]
+            maze.remove_wall((row, col), direction)
+            mark_visited(cell)
+            if move_history is not None:
+                move_history.append(((row, col), Moves.Visit))
 
-    while walk_root in visited_set:
-        walk_root = current_node = maze.random_node()
-    walk_map = {}
+            d_row, d_col = DIRECTION_OFFSETS[direction]
+            cell = (row + d_row) * cols + col + d_col
 
-    while len(visited_set) < len(maze.node_set):
-        LOG.debug(f'Visiting {current_node}')
-        rng.shuffle(directions)
-        for direction in directions:
-            direction = Direction(direction)
-            next_node = maze.move(current_node, direction)
-            if next_node in maze.node_set:  # Is it a legal, new node?
-                break
 
-        walk_map[current_node] = direction, next_node
-        current_node = next_node
+def hunt_and_kill(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+                  rng: np.random.Generator = None):
+    pass
 
-        if current_node in visited_set:
-            while current_node != walk_root:
-                direction, node = walk_map[walk_root]
 
-                maze.remove_wall(walk_root, direction)
-                visited_set.add(walk_root)
+def growing_tree(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+                 rng: np.random.Generator = None):
+    pass
 
-                walk_root = node
 
-            if len(visited_set) >= len(maze.node_set):
-                break
+def _row_blocks(maze: Maze, cells_per_block: int = 1 << 22):
+    """ Split the rows of a maze into blocks of about `cells_per_block` cells, to bound the memory of bulk carving """
+    block_rows = max(1, cells_per_block // maze.cols)
+    for row_start in range(0, maze.rows, block_rows):
+        yield row_start, min(block_rows, maze.rows - row_start)
 
-            r, c = rng.choice(np.argwhere((maze.maze_array >= float('inf')).all(axis=2)))
-            walk_root = current_node = int(r), int(c)
 
+def _carve_north_west(wall_bits: np.ndarray, row_start: int, north: np.ndarray, west: np.ndarray):
+    """ Open the north and west walls of the cells flagged in a block of rows, along with their neighbours' walls """
+    block_rows = north.shape[0]
+    block = wall_bits[row_start:row_start + block_rows]
+    np.bitwise_and(block, ALL_WALLS ^ WALL_BITS[Direction.N], out=block, where=north)
+    np.bitwise_and(block, ALL_WALLS ^ WALL_BITS[Direction.W], out=block, where=west)
 
-def hunt_and_kill(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
-    pass
+    if row_start == 0:
+        above, north = wall_bits[:block_rows - 1], north[1:]
+    else:
+        above = wall_bits[row_start - 1:row_start + block_rows - 1]
+    np.bitwise_and(above, ALL_WALLS ^ WALL_BITS[Direction.S], out=above, where=north)
+    np.bitwise_and(block[:, :-1], ALL_WALLS ^ WALL_BITS[Direction.E], out=block[:, :-1], where=west[:, 1:])
 
 
-def growing_tree(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
-    pass
+def _bulk_carve(maze: Maze, carve_block, loop_chance: float, move_history: list, rng: np.random.Generator):
+    """ Carve a maze block by block, where `carve_block(row_start, block_rows)` returns north and west carving masks """
+    wall_bits = maze.wall_bits()
+    for row_start, block_rows in _row_blocks(maze):
+        north, west = carve_block(row_start, block_rows)
+        if loop_chance:  # Open a random fraction of the remaining walls too
+            north |= rng.random(north.shape, dtype=np.float32) < loop_chance
+            west |= rng.random(west.shape, dtype=np.float32) < loop_chance
+        if row_start == 0:
+            north[0, :] = False
+        west[:, 0] = False
 
+        _carve_north_west(wall_bits, row_start, north, west)
+        if move_history is not None:
+            move_history.extend(((row, col), Moves.Visit)
+                                for row in range(row_start, row_start + block_rows) for col in range(maze.cols))
+    maze.set_wall_bits(wall_bits)
 
-def brinary_tree(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
-    pass
 
+def _random_bools(shape, rng: np.random.Generator) -> np.ndarray:
+    return rng.integers(2, size=shape, dtype=np.uint8).view(bool)
 
-def sidewinder(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None):
-    pass
+
+def brinary_tree(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+                 rng: np.random.Generator = None):
+    """ Binary tree, where every cell opens either its north or its west wall """
+    LOG.info('Creating maze using `brinary_tree`')
+    rng = resolve_rng(rng)
+
+    def carve_block(row_start, block_rows):
+        north = _random_bools((block_rows, maze.cols), rng)
+        north[:, 0] = True  # The first column can only go north
+        if row_start == 0:
+            north[0, :] = False  # The first row can only go west
+        return north, ~north
+
+    _bulk_carve(maze, carve_block, loop_chance, move_history, rng)
+
+
+def sidewinder(maze: Maze, *, loop_chance: float = 0.0, move_history: list = None,
+               rng: np.random.Generator = None):
+    """ Sidewinder, where each row is cut into random runs and every run opens the north wall of one of its cells """
+    LOG.info('Creating maze using `sidewinder`')
+    rng = resolve_rng(rng)
+
+    def carve_block(row_start, block_rows):
+        east = _random_bools((block_rows, maze.cols), rng)
+        east[:, -1] = False
+        if row_start == 0:
+            east[0, :-1] = True  # The first row is a single run
+
+        # The last column always ends a run, so runs never cross rows and the block can be segmented as one sequence
+        run_ends = np.flatnonzero(~east.reshape(-1))
+        run_starts = np.concatenate(([0], run_ends[:-1] + 1))
+        chosen = run_starts + (rng.random(run_ends.size) * (run_ends - run_starts + 1)).astype(np.int64)
+        north = np.zeros(block_rows * maze.cols, dtype=bool)
+        north[chosen] = True
+
+        west = np.zeros_like(east)
+        west[:, 1:] = east[:, :-1]
+        return north.reshape(block_rows, maze.cols), west
+
+    _bulk_carve(maze, carve_block, loop_chance, move_history, rng)
 
 
 if __name__ == '__main__':
@@ -175,4 +525,4 @@ if __name__ == '__main__':
 
     wilsons(maze)
 
-    AsciiView(maze)
+    AsciiView(maze).show()
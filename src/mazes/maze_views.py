@@ -1,12 +1,18 @@
+import io
 import logging
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk
 
 import numpy as np
 
 from src.mazes.maze import (
+    WALL_BITS,
     Direction,
+    Moves,
     Node,
+    move_history_array,
 )
 
 
@@ -22,67 +28,92 @@ class ViewBase:
 
 
 class AsciiView(ViewBase):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    """ A text rendering of a maze, drawn into a uint8 byte buffer straight from its wall bits.
 
-        self._maze_array: np.array = None
-        self.init_maze_array()
+    Each cell is drawn three characters wide and one tall, between `+` corners, `-` walls and `|` walls. Building the
+    view does not render it; `write` streams it to a file-like sink a block of rows at a time, and `str` gives the whole
+    of it.
+    """
+    ROWS_PER_WRITE = 256
 
-        print(self)
+    SPACE, DASH, PIPE, CORNER = b' ', b'-', b'|', b'+'
+    # The path marker is not ASCII, so a placeholder byte stands in for it until the text is decoded
+    PATH_BYTE = 0x01
+    PATH_SYMBOL = '•'
+    _DECODE = {PATH_BYTE: PATH_SYMBOL}
 
     def __str__(self):
-        maze_array = self._maze_array.copy()
-        if self.path:
-            self.add_path(maze_array)
-        if self.start:
-            self.add_symbol(maze_array, self.start, 'S')
-        if self.finish:
-            self.add_symbol(maze_array, self.finish, 'F')
-
-        return '\n'.join(''.join(row) for row in maze_array)
-
-    def add_symbol(self, maze_array, node, symbol):
-        row, col = node[0] * 2 + 1, node[1] * 4 + 2
-        maze_array[row, col] = symbol
-        return row, col
-
-    def _add_move(self, maze_array, node_a, node_b):
-        r1, c1 = self.add_symbol(maze_array, node_a, '•')
-        r2, c2 = self.add_symbol(maze_array, node_b, '•')
-
-        # Find halfway point of the start and end of the move
-        if r1 == r2:
-            row = r1
-            col = round((c1 + c2) / 2)
-        else:
-            row = round((r1 + r2) / 2)
-            col = c1
-
-        maze_array[row, col] = '•'
-
-    def add_path(self, maze_array):
-        for i in range(len(self.path) - 1):
-            self._add_move(maze_array, self.path[i], self.path[i + 1])
-
-    def init_maze_array(self):
-        maze_array = np.zeros((self.maze.rows * 2 + 1,
-                               self.maze.cols * 4 + 1)).astype(object)
-        maze_array[:, :] = ' '
-
-        row_coords, col_coords = np.arange(0, maze_array.shape[0], 2), np.arange(0, maze_array.shape[1], 4)
-
-        for i, row_coord in enumerate(row_coords[:-1]):
-            maze_array[row_coord, :-1] = np.where(self.maze.maze_array[i, :, Direction.N.value] < float('inf'), ' ' * 4, '-' * 4).view('<U1')
-        maze_array[-1, :] = '-'
-
-        for i, col_coord in enumerate(col_coords[:-1]):
-            maze_array[:-1, col_coord] = np.where(self.maze.maze_array[:, i, Direction.W.value] < float('inf'), ' ' * 2, '|' * 2).view('<U1')
-        maze_array[:, -1] = '|'
-
-        mesh_rows, mesh_cols = np.meshgrid(np.arange(0, maze_array.shape[0], 2), np.arange(0, maze_array.shape[1], 4))
-        mesh_rows, mesh_cols = mesh_rows.reshape(-1), mesh_cols.reshape(-1)
-        maze_array[mesh_rows, mesh_cols] = '+'
-        self._maze_array = maze_array
+        text = io.StringIO()
+        self.write(text)
+        return text.getvalue()[:-1]
+
+    def show(self):
+        """ Print the maze to standard output """
+        self.write(sys.stdout)
+
+    def write(self, sink):
+        """ Write the maze to a sink, one block of rows at a time.
+
+        Args:
+            sink: A text file-like object, or a binary one which is sent UTF-8
+        """
+        is_binary = not isinstance(sink, io.TextIOBase)
+        marks = self._marks()
+        # Built once, since `wall_bits` converts the whole maze on every call
+        wall_bits = self.maze.wall_bits()
+
+        for first_row in range(0, self.maze.rows, self.ROWS_PER_WRITE):
+            last_row = min(first_row + self.ROWS_PER_WRITE, self.maze.rows)
+            block = self._render_rows(wall_bits[first_row:last_row])
+
+            # Only the marks that fall in this block's lines of text are drawn on it
+            low, high = np.searchsorted(marks[0], (first_row * 2, last_row * 2))
+            block[marks[0][low:high] - first_row * 2, marks[1][low:high]] = marks[2][low:high]
+            self._write_block(sink, block, is_binary)
+
+        bottom = np.full((1, self.maze.cols * 4 + 1), ord(self.DASH), dtype=np.uint8)
+        bottom[0, ::4] = ord(self.CORNER)
+        self._write_block(sink, bottom, is_binary)
+
+    def _write_block(self, sink, block: np.ndarray, is_binary: bool):
+        lines = np.full((block.shape[0], block.shape[1] + 1), ord('\n'), dtype=np.uint8)
+        lines[:, :-1] = block
+        text = lines.tobytes().decode('ascii').translate(self._DECODE)
+        sink.write(text.encode('utf-8') if is_binary else text)
+
+    def _render_rows(self, wall_bits: np.ndarray) -> np.ndarray:
+        """ The lines of text above and through a block of maze rows, given as their `WALL_BITS` flags """
+        rows, cols = wall_bits.shape
+
+        block = np.full((rows * 2, cols * 4 + 1), ord(self.SPACE), dtype=np.uint8)
+        north = block[0::2, :-1].reshape(rows, cols, 4)
+        north[(wall_bits & WALL_BITS[Direction.N]) != 0] = ord(self.DASH)
+        block[1::2, :-1:4][(wall_bits & WALL_BITS[Direction.W]) != 0] = ord(self.PIPE)
+        block[1::2, -1] = ord(self.PIPE)
+        block[0::2, ::4] = ord(self.CORNER)
+        return block
+
+    def _marks(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ The text row, text column and byte of every path, start and finish mark, sorted by row """
+        rows, cols, symbols = [], [], []
+        if self.path and len(self.path) > 1:
+            path = np.asarray(self.path, dtype=np.int64).reshape(-1, 2)
+            # Each cell on the path, and the wall position between each pair of consecutive cells
+            rows += [path[:, 0] * 2 + 1, path[:-1, 0] + path[1:, 0] + 1]
+            cols += [path[:, 1] * 4 + 2, (path[:-1, 1] + path[1:, 1]) * 2 + 2]
+            symbols.append(np.full(len(path) * 2 - 1, self.PATH_BYTE, dtype=np.uint8))
+        for node, symbol in ((self.start, b'S'), (self.finish, b'F')):
+            if node:
+                rows.append(np.array([node[0] * 2 + 1]))
+                cols.append(np.array([node[1] * 4 + 2]))
+                symbols.append(np.frombuffer(symbol, dtype=np.uint8))
+
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+        rows, cols, symbols = np.concatenate(rows), np.concatenate(cols), np.concatenate(symbols)
+        # A stable sort keeps the start and finish after the path, so they are drawn over it
+        order = np.argsort(rows, kind='stable')
+        return rows[order], cols[order], symbols[order]
 
 
 class TkRectCanvas(ViewBase):
@@ -98,23 +129,53 @@ class TkRectCanvas(ViewBase):
     START_TAG = 'start_node'
     FINISH_TAG = 'finish_node'
     SYMBOL_TAG = 'symbol_node'
+    REPLAY_TAG = 'replay'
 
     BG_COLOUR = 'gray90'
+    REPLAY_COLOURS = {Moves.Visit: 'light sky blue', Moves.Complete: 'gray75'}
+
+    # Replay frames are scheduled this far apart, less the time the last frame took to draw
+    FRAME_MS = 16
+
+    # The canvas is never asked to be larger than this, and bigger mazes are panned and zoomed instead
+    MAX_WIDTH_PX = 1600
+    MAX_HEIGHT_PX = 1000
+
+    ZOOM_STEP = 1.25
+    MIN_SCALE = 0.02
+    MAX_SCALE = 4.0
 
     def __init__(self, master, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.frame = ttk.Frame(master)
 
+        self.scale = 1.0
+        self._wall_runs = None
+        self._runs_source = None
+        self._redraw_pending = False
+
+        self.replay_speed = 1000.0  # Events per second
+        self._replay_history = None
+        self._replay_state = None
+        self._replay_items = {}
+        self._replay_job = None
+
         self.canvas: tk.Canvas = None
         self.init_canvas()
 
         self.path_is_drawn = False
+        # Whether the path should be shown, which redraws of the maze respect
+        self.path_visible = True
 
         self.draw_maze()
 
+    @property
+    def square_offset(self) -> float:
+        return (self.SQUARE_PX + self.LINE_WIDTH) * self.scale
+
     def rc_to_xy(self, node, align=tk.NW):
-        square_offset = (self.SQUARE_PX + self.LINE_WIDTH)
+        square_offset = self.square_offset
         x, y = (node[1] * square_offset + self.MARGIN,
                 node[0] * square_offset + self.MARGIN)
         match align:
@@ -154,13 +215,74 @@ class TkRectCanvas(ViewBase):
         if self.canvas:
             self.canvas.destroy()
 
-        width_px = self.maze.cols * (self.SQUARE_PX + self.LINE_WIDTH) + self.LINE_WIDTH + 2 * self.MARGIN
-        height_px = self.maze.rows * (self.SQUARE_PX + self.LINE_WIDTH) + self.LINE_WIDTH + 2 * self.MARGIN
+        width_px, height_px = self.maze_extent()
+        width_px, height_px = min(width_px, self.MAX_WIDTH_PX), min(height_px, self.MAX_HEIGHT_PX)
 
         self.log.debug(f"Creating canvas {width_px}x{height_px}")
 
         self.canvas = tk.Canvas(self.frame, width=width_px, height=height_px, background=self.BG_COLOUR)
         self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.update_scroll_region()
+
+        # Drag to pan, and scroll to zoom about the pointer
+        self.canvas.bind('<ButtonPress-1>', lambda event: self.canvas.scan_mark(event.x, event.y))
+        self.canvas.bind('<B1-Motion>', self._pan)
+        self.canvas.bind('<MouseWheel>', lambda event: self.zoom(
+            self.ZOOM_STEP if event.delta > 0 else 1 / self.ZOOM_STEP, event.x, event.y))
+        self.canvas.bind('<Button-4>', lambda event: self.zoom(self.ZOOM_STEP, event.x, event.y))
+        self.canvas.bind('<Button-5>', lambda event: self.zoom(1 / self.ZOOM_STEP, event.x, event.y))
+        self.canvas.bind('<Configure>', lambda event: self.schedule_redraw())
+
+    def maze_extent(self) -> tuple[float, float]:
+        """ The width and height in pixels of the whole maze at the current zoom """
+        return (self.maze.cols * self.square_offset + self.LINE_WIDTH + 2 * self.MARGIN,
+                self.maze.rows * self.square_offset + self.LINE_WIDTH + 2 * self.MARGIN)
+
+    def update_scroll_region(self):
+        self.canvas.configure(scrollregion=(0, 0, *self.maze_extent()))
+
+    def _pan(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.schedule_redraw()
+
+    def zoom(self, factor: float, x: int = 0, y: int = 0):
+        """ Scale the maze by `factor`, keeping the point at window position `(x, y)` in place """
+        scale = min(max(self.scale * factor, self.MIN_SCALE), self.MAX_SCALE)
+        if scale == self.scale:
+            return
+
+        canvas_x, canvas_y = self.canvas.canvasx(x), self.canvas.canvasy(y)
+        ratio = scale / self.scale
+        self.scale = scale
+        self.update_scroll_region()
+
+        width_px, height_px = self.maze_extent()
+        self.canvas.xview_moveto(((canvas_x - self.MARGIN) * ratio + self.MARGIN - x) / width_px)
+        self.canvas.yview_moveto(((canvas_y - self.MARGIN) * ratio + self.MARGIN - y) / height_px)
+        self.draw_maze()
+
+    def schedule_redraw(self):
+        """ Redraw once the canvas is idle, however many times this is called before then """
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.canvas.after_idle(self._redraw)
+
+    def _redraw(self):
+        self._redraw_pending = False
+        self.draw_maze()
+
+    def visible_cells(self) -> tuple[int, int, int, int]:
+        """ The first and last grid lines, as `(first_row, last_row, first_col, last_col)`, in view on the canvas """
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            # Not yet mapped to the screen, so go by the size it asked for
+            width, height = int(self.canvas['width']), int(self.canvas['height'])
+
+        square_offset = self.square_offset
+        left, top = self.canvas.canvasx(0) - self.MARGIN, self.canvas.canvasy(0) - self.MARGIN
+        right, bottom = self.canvas.canvasx(width) - self.MARGIN, self.canvas.canvasy(height) - self.MARGIN
+        return (max(0, int(top // square_offset)), min(self.maze.rows, int(-(-bottom // square_offset))),
+                max(0, int(left // square_offset)), min(self.maze.cols, int(-(-right // square_offset))))
 
     def draw_agent(self, node, direction):
         match direction:
@@ -175,31 +297,41 @@ class TkRectCanvas(ViewBase):
             case _:
                 raise RuntimeError(f"{direction=}")
 
-        agent = agent * self.SQUARE_PX * 0.6
+        agent = agent * self.SQUARE_PX * self.scale * 0.6
         agent = agent + np.array(self.rc_to_xy(node, align=tk.CENTER))
 
         return self.canvas.create_polygon(*agent.reshape(-1), fill='blue')
 
-    def _draw_wall(self, node, direction):
-        match direction:
-            case Direction.N:
-                line_origin = node
-                line_dest = self.maze.move(node, Direction.E)
-            case Direction.W:
-                line_origin = node
-                line_dest = self.maze.move(node, Direction.S)
-            case Direction.S:
-                line_origin = self.maze.move(node, Direction.S)
-                line_dest = self.maze.move(self.maze.move(node, Direction.E), Direction.S)
-            case Direction.E:
-                line_origin = self.maze.move(node, Direction.E)
-                line_dest = self.maze.move(self.maze.move(node, Direction.E), Direction.S)
-            case _:
-                raise RuntimeError(f"{direction=}")
-        line_origin_px = self.rc_to_xy(line_origin, align=tk.NW)
-        line_dest_px = self.rc_to_xy(line_dest, align=tk.NW)
-
-        self.canvas.create_line(*line_origin_px, *line_dest_px, width=self.LINE_WIDTH, tags=(self.WALLS_TAG,))
+    @staticmethod
+    def _runs(segments: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Find every run of consecutive walls along each line of grid points.
+
+        Args:
+            segments: A `(lines, length)` bool array, True where there is a wall between points `j` and `j + 1`
+
+        Returns:
+            The line of each run, and the grid points it starts and ends at
+        """
+        lines, length = segments.shape
+        padded = np.zeros((lines, length + 2), dtype=np.int8)
+        padded[:, 1:-1] = segments
+        edges = np.diff(padded, axis=1).reshape(-1)
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        return starts // (length + 1), starts % (length + 1), ends % (length + 1)
+
+    def wall_runs(self) -> tuple[tuple, tuple]:
+        """ The horizontal runs of walls along each row line, and the vertical runs along each column line """
+        wall_bits = self.maze.wall_bits()
+        rows, cols = wall_bits.shape
+
+        horizontal = np.empty((rows + 1, cols), dtype=bool)
+        horizontal[:-1] = (wall_bits & WALL_BITS[Direction.N]) != 0
+        horizontal[-1] = (wall_bits[-1] & WALL_BITS[Direction.S]) != 0
+
+        vertical = np.empty((cols + 1, rows), dtype=bool)
+        vertical[:-1] = ((wall_bits & WALL_BITS[Direction.W]) != 0).T
+        vertical[-1] = (wall_bits[:, -1] & WALL_BITS[Direction.E]) != 0
+        return self._runs(horizontal), self._runs(vertical)
 
     def draw_walls(self, maze=None):
         if maze:
@@ -209,18 +341,28 @@ class TkRectCanvas(ViewBase):
         if not self.maze:
             return 1
 
-        for i in range(self.maze.rows):
-            for j in range(self.maze.cols):
-                if self.maze.is_wall((i, j), Direction.N):
-                    self._draw_wall((i, j), Direction.N)
-                if self.maze.is_wall((i, j), Direction.W):
-                    self._draw_wall((i, j), Direction.W)
-        for i in range(self.maze.rows):
-            if self.maze.is_wall((i, self.maze.cols - 1), Direction.E):
-                self._draw_wall((i, self.maze.cols - 1), Direction.E)
-        for j in range(self.maze.cols):
-            if self.maze.is_wall((self.maze.rows - 1, j), Direction.S):
-                self._draw_wall((self.maze.rows - 1, j), Direction.S)
+        if self._runs_source != (self.maze, self.maze.version):
+            self._wall_runs = self.wall_runs()
+            self._runs_source = (self.maze, self.maze.version)
+            self.update_scroll_region()
+
+        # Only the parts of runs inside the view are drawn, so the number of items stays bounded however big the maze
+        first_row, last_row, first_col, last_col = self.visible_cells()
+        (row_lines, row_starts, row_ends), (col_lines, col_starts, col_ends) = self._wall_runs
+        for lines, starts, ends, first_line, last_line, first_point, last_point, is_horizontal in (
+                (row_lines, row_starts, row_ends, first_row, last_row, first_col, last_col, True),
+                (col_lines, col_starts, col_ends, first_col, last_col, first_row, last_row, False)):
+            visible = (lines >= first_line) & (lines <= last_line) & (starts < last_point) & (ends > first_point)
+            starts = np.maximum(starts[visible], first_point)
+            ends = np.minimum(ends[visible], last_point)
+
+            for line, start, end in zip(lines[visible].tolist(), starts.tolist(), ends.tolist()):
+                if is_horizontal:
+                    line_origin, line_dest = (line, start), (line, end)
+                else:
+                    line_origin, line_dest = (start, line), (end, line)
+                self.canvas.create_line(*self.rc_to_xy(line_origin, align=tk.NW), *self.rc_to_xy(line_dest, align=tk.NW),
+                                        width=self.LINE_WIDTH, tags=(self.WALLS_TAG,))
 
     def draw_path(self, path: list[Node] = None):
         if path:
@@ -231,8 +373,10 @@ class TkRectCanvas(ViewBase):
             return 1
 
         self.path_is_drawn = True
+        first_row, last_row, first_col, last_col = self.visible_cells()
         for node in self.path:
-            self.colour_node(node, 'gray70', tags=self.PATH_TAG)
+            if first_row <= node[0] < last_row and first_col <= node[1] < last_col:
+                self.colour_node(node, 'gray70', tags=self.PATH_TAG)
         self.canvas.tag_lower(self.PATH_TAG, self.SYMBOL_TAG)
 
     def delete_path(self):
@@ -240,10 +384,11 @@ class TkRectCanvas(ViewBase):
         self.path_is_drawn = False
 
     def toggle_path(self):
-        if self.path_is_drawn:
-            self.delete_path()
-        else:
+        self.path_visible = not self.path_visible
+        if self.path_visible:
             self.draw_path()
+        else:
+            self.delete_path()
 
     def draw_letter(self, node: Node, letter: str = None, tags: str | list[str] = None):
         if isinstance(tags, str):
@@ -277,14 +422,107 @@ class TkRectCanvas(ViewBase):
         self.draw_letter(self.finish, letter="F", tags=[self.FINISH_TAG, self.SYMBOL_TAG])
         self.canvas.tag_lower(self.FINISH_TAG, self.WALLS_TAG)
 
+    def replay(self, move_history: list, on_finish=None):
+        """ Animate a `move_history`, colouring each node by the last move made on it.
+
+        Playback runs from `after` callbacks, so the Tk mainloop is never blocked. Each frame plays every event that is
+        due at `replay_speed`, however many that is, and only redraws the nodes whose colour ends up changing, so a
+        slow frame makes the next one catch up rather than the animation falling behind.
+
+        Args:
+            move_history: The `(node, Moves)` events recorded by a generation or pathfinding algorithm, or the same
+                events as returned by `move_history_array`
+            on_finish: Called with no arguments once the last event has been played
+        """
+        self.stop_replay()
+        self._replay_history = (move_history if isinstance(move_history, np.ndarray)
+                                else move_history_array(move_history))
+        self._replay_state = np.full((self.maze.rows, self.maze.cols), -1, dtype=np.int8)
+        self._replay_position = 0
+        self._replay_due = 0.0
+        self._replay_on_finish = on_finish
+        self._replay_clock = time.perf_counter()
+        self._replay_job = self.canvas.after(self.FRAME_MS, self._replay_frame)
+
+    @property
+    def is_replaying(self) -> bool:
+        return self._replay_job is not None
+
+    def stop_replay(self):
+        """ Stop any replay in progress and remove its colouring """
+        if self._replay_job is not None:
+            self.canvas.after_cancel(self._replay_job)
+            self._replay_job = None
+        self._replay_history = self._replay_state = None
+        self._replay_items = {}
+        self.canvas.delete(self.REPLAY_TAG)
+
+    def _replay_frame(self):
+        frame_start = time.perf_counter()
+        self._replay_due += (frame_start - self._replay_clock) * self.replay_speed
+        self._replay_clock = frame_start
+
+        history, position = self._replay_history, self._replay_position
+        end = min(len(history), position + int(self._replay_due))
+        self._replay_due -= end - position
+        self._replay_position = end
+
+        # Coalesce the frame's events so each node is drawn once, in its final colour
+        events = history[position:end]
+        if len(events):
+            _, last_seen = np.unique((events[:, 0] * self.maze.cols + events[:, 1])[::-1], return_index=True)
+            latest = events[len(events) - 1 - last_seen]
+            self._replay_state[latest[:, 0], latest[:, 1]] = latest[:, 2]
+
+            first_row, last_row, first_col, last_col = self.visible_cells()
+            visible = ((first_row <= latest[:, 0]) & (latest[:, 0] < last_row)
+                       & (first_col <= latest[:, 1]) & (latest[:, 1] < last_col))
+            for row, col, move in latest[visible].tolist():
+                self._colour_replay_node((row, col), move)
+            self.canvas.tag_lower(self.REPLAY_TAG, self.WALLS_TAG)
+
+        if end >= len(history):
+            self._replay_job = None
+            if self._replay_on_finish:
+                self._replay_on_finish()
+            return
+
+        elapsed_ms = int((time.perf_counter() - frame_start) * 1000)
+        self._replay_job = self.canvas.after(max(1, self.FRAME_MS - elapsed_ms), self._replay_frame)
+
+    def _colour_replay_node(self, node: Node, move: Moves):
+        colour = self.REPLAY_COLOURS[Moves(move)]
+        item = self._replay_items.get(node)
+        if item is None:
+            self._replay_items[node] = self.colour_node(node, colour, tags=self.REPLAY_TAG)
+        else:
+            self.canvas.itemconfigure(item, fill=colour)
+
+    def draw_replay(self):
+        """ Redraw the colouring of the replay in progress, for the part of the maze in view """
+        self.canvas.delete(self.REPLAY_TAG)
+        self._replay_items = {}
+        if self._replay_state is None:
+            return
+
+        first_row, last_row, first_col, last_col = self.visible_cells()
+        rows, cols = np.nonzero(self._replay_state[first_row:last_row, first_col:last_col] >= 0)
+        for row, col in zip((rows + first_row).tolist(), (cols + first_col).tolist()):
+            self._colour_replay_node((row, col), self._replay_state[row, col])
+        self.canvas.tag_lower(self.REPLAY_TAG, self.WALLS_TAG)
+
     def draw_maze(self):
         if self.draw_walls():
             return
+        self.draw_replay()
         if self.draw_start():
             return
         if self.draw_finish():
             return
-        self.draw_path()
+        if self.path_visible:
+            self.draw_path()
+        else:
+            self.delete_path()
 
 
 class TkView(ViewBase):
@@ -1,15 +1,130 @@
+import heapq
+import itertools
 import logging
-from collections import deque
+import time
+from collections import (
+    OrderedDict,
+    deque,
+)
+from contextlib import (
+    contextmanager,
+    nullcontext,
+)
+from dataclasses import (
+    dataclass,
+    field,
+)
+
+import numpy as np
 
 from src.mazes.maze import (
+    DIRECTION_OFFSETS,
+    Direction,
     Maze,
+    MazeGraph,
+    Moves,
     Node,
+    RectangularMaze,
+    open_moves,
+    resolve_rng,
 )
 
 LOG = logging.getLogger('PathFinding')
 LOG.setLevel('INFO')
 
 
+@dataclass
+class SearchStats:
+    """ Counters filled in by a solver when one is passed as its `stats` argument.
+
+    The same instance can be passed to many queries to accumulate totals, or separate instances summed with `+`.
+    """
+    queries: int = 0
+    expanded: int = 0  # Nodes taken from the frontier and explored
+    relaxed: int = 0  # Edges that improved the score of the node they lead to
+    reopened: int = 0  # Improvements to nodes that had already been expanded
+    frontier_peak: int = 0
+    phase_seconds: dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def phase(self, name: str):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + time.perf_counter() - begin
+
+    def __iadd__(self, other: 'SearchStats'):
+        self.queries += other.queries
+        self.expanded += other.expanded
+        self.relaxed += other.relaxed
+        self.reopened += other.reopened
+        self.frontier_peak = max(self.frontier_peak, other.frontier_peak)
+        for name, seconds in other.phase_seconds.items():
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+        return self
+
+    def __add__(self, other: 'SearchStats') -> 'SearchStats':
+        total = SearchStats()
+        total += self
+        total += other
+        return total
+
+
+def _phase(stats: SearchStats | None, name: str):
+    return nullcontext() if stats is None else stats.phase(name)
+
+
+class PriorityFrontier:
+    """ Min-priority queue of nodes, using lazy deletion on a binary heap in place of decrease-key.
+
+    Pushing a node that is already queued replaces its priority; the superseded heap entry is skipped when it
+    surfaces. Ties are broken in insertion order.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._priority = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._priority)
+
+    def __bool__(self):
+        return bool(self._priority)
+
+    def __contains__(self, node):
+        return node in self._priority
+
+    def push(self, node, priority):
+        self._priority[node] = priority
+        heapq.heappush(self._heap, (priority, next(self._counter), node))
+
+    def pop(self):
+        """ Remove and return the node with the lowest priority, along with that priority """
+        heap, live = self._heap, self._priority
+        while heap:
+            priority, _, node = heapq.heappop(heap)
+            if live.get(node, None) == priority:
+                del live[node]
+                return node, priority
+        raise IndexError('pop from an empty frontier')
+
+    def remove(self, node):
+        """ Take a node out of the frontier, if it is queued """
+        self._priority.pop(node, None)
+
+    def peek(self):
+        """ The lowest priority in the frontier, without removing its node """
+        heap, live = self._heap, self._priority
+        while heap:
+            priority, _, node = heap[0]
+            if live.get(node, None) == priority:
+                return priority
+            heapq.heappop(heap)
+        raise IndexError('peek at an empty frontier')
+
+
 def reconstruct_path(move_map, goal) -> list:
     node = goal
 
@@ -20,142 +135,606 @@ def reconstruct_path(move_map, goal) -> list:
     return list(reversed(path))
 
 
-def dijkstras_mapper(maze: Maze, start: Node) -> tuple[dict, dict]:
+def _graph_key(maze: Maze | MazeGraph, node: Node):
+    """ The key a solver uses for a node internally, which is its id when searching a `MazeGraph` """
+    return maze.node_id(node) if isinstance(maze, MazeGraph) else node
+
+
+def _history_recorder(maze: Maze | MazeGraph, move_history: list | None):
+    """ A function appending `(node, Moves)` events to a move history, converting graph ids back to nodes, or None """
+    if move_history is None:
+        return None
+    if isinstance(maze, MazeGraph):
+        node_at = maze.node_at
+        return lambda key, move: move_history.append((node_at(key), move))
+    return lambda key, move: move_history.append((key, move))
+
+
+def _solver_result(maze: Maze | MazeGraph, g_score: dict, path: list) -> tuple[dict, list[Node]]:
+    """ Convert a solver's scores and path back from graph ids to nodes, if it searched a `MazeGraph` """
+    if not isinstance(maze, MazeGraph):
+        return g_score, path
+    node_at = maze.node_at
+    return {node_at(node_id): score for node_id, score in g_score.items()}, [node_at(node_id) for node_id in path]
+
+
+def dijkstras_mapper(maze: Maze | MazeGraph, start: Node, *, stats: SearchStats = None) -> tuple[dict, dict]:
     """ Dijkstra's implementation that maps the entire graph in relation to the start node.
 
     Args:
-        maze: The maze to be mapped
+        maze: The maze to be mapped, or a `MazeGraph` compiled from it
         start: The starting node
+        stats: Collects counters and timings for the search when given
 
     Returns:
         A dictionary of the G_score for every node on the map
         A dictionary of the previous node in the optimal path to the start
     """
-    frontier_set = {start}
+    g_score, move_map = _map_from(maze, _graph_key(maze, start), stats)
 
-    move_map = {start: None}
-    g_score = {}
-    g_score[start] = 0
+    if isinstance(maze, MazeGraph):
+        node_at = maze.node_at
+        g_score = {node_at(node_id): score for node_id, score in g_score.items()}
+        move_map = {node_at(node_id): None if previous is None else node_at(previous)
+                    for node_id, previous in move_map.items()}
+    return g_score, move_map
 
-    while frontier_set:
-        current_node = min(frontier_set, key=lambda n: g_score[n])
-        frontier_set.remove(current_node)
 
-        for direction, node in maze.get_neighbours(current_node):
-            cost = maze.edge_cost(current_node, direction)
-            if g_score[current_node] + cost < g_score.get(node, float('inf')):
-                frontier_set.add(node)
-                g_score[node] = g_score[current_node] + cost
-                move_map[node] = current_node
+def _map_from(maze: Maze | MazeGraph, start_key, stats: SearchStats | None) -> tuple[dict, dict]:
+    """ The shortest path tree of `dijkstras_mapper`, keyed as the solvers key nodes internally """
+    frontier = PriorityFrontier()
+    frontier.push(start_key, 0)
 
+    move_map = {start_key: None}
+    g_score = {}
+    g_score[start_key] = 0
+
+    if stats is not None:
+        stats.queries += 1
+    with _phase(stats, 'search'):
+        while frontier:
+            current_node, _ = frontier.pop()
+            if stats is not None:
+                stats.expanded += 1
+
+            for node, cost in maze.weighted_neighbours(current_node):
+                if g_score[current_node] + cost < g_score.get(node, float('inf')):
+                    reopened = stats is not None and node in g_score and node not in frontier
+                    g_score[node] = g_score[current_node] + cost
+                    move_map[node] = current_node
+                    frontier.push(node, g_score[node])
+                    if stats is not None:
+                        _count_relaxation(stats, reopened, len(frontier))
     return g_score, move_map
 
 
-def dijkstras(maze: Maze, start: Node, finish: Node, *, move_history: list = None) -> tuple[dict, list[Node]]:
-    return weighted_a_star(maze, start, finish, weight=0, move_history=move_history)
+class PathCache:
+    """ A bounded, least recently used cache of the shortest path trees of a maze, one per source node.
 
+    The maze is undirected, so the tree of either end answers a query, by walking parents from the other end. The trees
+    are searched over a `MazeGraph` compiled from the maze, and are all dropped as soon as the maze's walls change.
+    """
 
-def a_star(maze: Maze, start: Node, finish: Node, *, move_history: list = None) -> tuple[dict, list[Node]]:
-    return weighted_a_star(maze, start, finish, weight=1, move_history=move_history)
+    def __init__(self, maze: Maze, maxsize: int = 8):
+        self.maze = maze
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._trees: OrderedDict[Node, tuple[dict, dict]] = OrderedDict()
+        self._graph = None
+        self._version = None
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def clear(self):
+        self._trees.clear()
+        self._graph = None
+
+    def _search_space(self) -> Maze | MazeGraph:
+        if self._version != self.maze.version:
+            self.clear()
+            self._version = self.maze.version
+        if self._graph is None:
+            self._graph = self.maze.freeze() if isinstance(self.maze, RectangularMaze) else self.maze
+        return self._graph
+
+    def tree(self, source: Node, *, stats: SearchStats = None) -> tuple[dict, dict]:
+        """ The scores and parents of the shortest path tree from `source`, keyed as the solvers key nodes internally """
+        graph = self._search_space()
+        if source in self._trees:
+            self.hits += 1
+            self._trees.move_to_end(source)
+            return self._trees[source]
+
+        self.misses += 1
+        tree = self._trees[source] = _map_from(graph, _graph_key(graph, source), stats)
+        if len(self._trees) > self.maxsize:
+            self._trees.popitem(last=False)
+        return tree
+
+    def query(self, start: Node, finish: Node, *, stats: SearchStats = None) -> tuple[float, list[Node]]:
+        """ The cost and path of the cheapest route between two nodes, mapping from `start` if neither is cached
+
+        Args:
+            start: The node the path leaves from
+            finish: The node the path arrives at
+            stats: Collects counters and timings for the search, if one is needed
+
+        Returns:
+            The cost of the path, and the nodes along it from `start` to `finish`
+        """
+        graph = self._search_space()
+        reverse = finish in self._trees and start not in self._trees
+        source, target = (finish, start) if reverse else (start, finish)
+
+        g_score, move_map = self.tree(source, stats=stats)
+        target_key = _graph_key(graph, target)
+        if target_key not in g_score:
+            raise RuntimeError(f"Could not find path from {start} to {finish}")
+
+        path = reconstruct_path(move_map, target_key)
+        if reverse:
+            path.reverse()
+        return g_score[target_key], _solver_result(graph, {}, path)[1]
+
+
+def _count_relaxation(stats: SearchStats, reopened: bool, frontier_size: int):
+    stats.relaxed += 1
+    if reopened:
+        stats.reopened += 1
+    if frontier_size > stats.frontier_peak:
+        stats.frontier_peak = frontier_size
+
+
+def distance_field(maze: RectangularMaze, sources: Node | list[Node]) -> tuple[np.ndarray, np.ndarray]:
+    """ Breadth first search of a unit-cost maze from one or more sources, expanding a whole frontier at a time.
 
+    Args:
+        maze: The maze to be mapped, whose open edges must all have unit cost
+        sources: A node, or a list of nodes, to measure distances from. With no sources every node is unreachable
 
-def weighted_a_star(maze: Maze, start: Node, finish: Node, *, weight: float = 2.0, move_history: list = None) -> tuple[dict, list[Node]]:
-    frontier_set = {start}
+    Returns:
+        A `(rows, cols)` int32 array of the distance to the nearest source, -1 where no source can be reached
+        A `(rows, cols)` int8 array of the `Direction` value leading one step back toward that source, -1 at the
+            sources and unreachable nodes
+    """
+    if not maze.has_unit_costs:
+        raise ValueError('distance_field requires every open edge to have unit cost')
 
-    move_map = {start: None}
-    g_score = {start: 0}
-    f_score = {start: maze.find_distance(start, finish) * weight}
+    rows, cols = maze.rows, maze.cols
+    is_open = open_moves(maze.wall_bits()).reshape(-1, 4)
 
-    while frontier_set:
-        # Possibility for optimisation here by using a heap/priority queue instead of a set ( O(n) -> O(log(n)) )
-        current_node = min(frontier_set, key=lambda n: f_score[n])
-        if current_node == finish:
-            return g_score, reconstruct_path(move_map, finish)
+    open_edges = []
+    for direction in Direction:
+        d_row, d_col = DIRECTION_OFFSETS[direction.value]
+        open_edges.append((is_open[:, direction.value], d_row * cols + d_col, direction.flip().value))
 
-        frontier_set.remove(current_node)
+    distance = np.full(rows * cols, -1, dtype=np.int32)
+    parent = np.full(rows * cols, -1, dtype=np.int8)
 
-        for direction, node in maze.get_neighbours(current_node):
-            possible_g_score = g_score[current_node] + maze.edge_cost(current_node, direction)
-            if possible_g_score < g_score.get(node, float('inf')):
-                g_score[node] = possible_g_score
-                f_score[node] = possible_g_score + maze.find_distance(node, finish) * weight
-                move_map[node] = current_node
+    # A single node and an empty list both become `(n, 2)`, where `atleast_2d` would make an empty list `(1, 0)`
+    source_array = np.asarray(sources, dtype=np.intp).reshape(-1, 2)
+    frontier = np.unique(np.ravel_multi_index((source_array[:, 0], source_array[:, 1]), (rows, cols)))
+    distance[frontier] = 0
 
-                # This is only relevant if a node is reached a second time with a lower score, as might happen
-                #  if the heuristic function (find_distance) is not consistent
-                if node not in frontier_set:
-                    frontier_set.add(node)
+    level = 0
+    while frontier.size:
+        level += 1
+        reached = []
+        for is_open, offset, back_direction in open_edges:
+            nodes = frontier[is_open[frontier]] + offset
+            nodes = nodes[distance[nodes] < 0]
+            distance[nodes] = level
+            parent[nodes] = back_direction
+            reached.append(nodes)
+        frontier = np.concatenate(reached)
 
-    raise RuntimeError(f"Could not find path from {start} to {finish}: {move_map}")
+    return distance.reshape(rows, cols), parent.reshape(rows, cols)
 
 
-def breadth_first_search(maze: Maze, start: Node, finish: Node) -> tuple[dict, list[Node]]:
-    frontier_queue = deque([start])
+def field_path(parent: np.ndarray, node: Node) -> list[Node]:
+    """ Follow the parent directions of a `distance_field` from a node back to its nearest source
 
-    move_map = {start: None}
-    g_score = {start: 0}
+    Returns:
+        The path from the source to the node, inclusive
+    """
+    row, col = node
+    path = [(row, col)]
+    while (direction := parent[row, col]) >= 0:
+        d_row, d_col = DIRECTION_OFFSETS[direction]
+        row, col = row + d_row, col + d_col
+        path.append((row, col))
 
-    while frontier_queue:
-        current_node = frontier_queue.popleft()
-        if current_node == finish:
-            return g_score, reconstruct_path(move_map, finish)
+    return list(reversed(path))
 
-        for direction, node in maze.get_neighbours(current_node):
-            possible_g_score = g_score[current_node] + maze.edge_cost(current_node, direction)
-            if possible_g_score < g_score.get(node, float('inf')):
-                g_score[node] = possible_g_score
-                move_map[node] = current_node
 
-                if node not in frontier_queue:
-                    frontier_queue.append(node)
+def maze_diameter(maze: RectangularMaze) -> tuple[Node, Node, int]:
+    """ The ends of the longest shortest path in a unit-cost maze, found with two `distance_field` passes.
 
-    raise RuntimeError(f"Could not find path from {start} to {finish}")
+    The node furthest from any node is one end of a diameter, and the node furthest from that is the other. This is exact
+    when the maze is a tree, as mazes generated with no `loop_chance` are; with loops it finds a long path, but not
+    always the longest.
 
+    Returns:
+        The two ends, and the number of moves between them
+    """
+    distance, _ = distance_field(maze, (0, 0))
+    first_end = np.unravel_index(np.argmax(distance), distance.shape)
+    distance, _ = distance_field(maze, first_end)
+    second_end = np.unravel_index(np.argmax(distance), distance.shape)
+    return (int(first_end[0]), int(first_end[1])), (int(second_end[0]), int(second_end[1])), int(distance[second_end])
 
-def _dfs_recurse(maze: Maze, current_node: Node, finish: Node, g_score: dict, move_map: dict):
-    if current_node == finish:
-        return
 
-    for direction, node in maze.get_neighbours(current_node):
-        if node in move_map or maze.edge_cost(current_node, direction) == float('inf'):
-            continue
-        move_map[node] = current_node
-        g_score[node] = g_score[current_node] + maze.edge_cost(current_node, direction)
-        if _dfs_recurse(maze, node, finish, g_score, move_map):
-            return
+def sample_endpoints(maze: RectangularMaze, min_distance: int, max_distance: int = None,
+                     rng: np.random.Generator = None, *, attempts: int = 3) -> tuple[Node, Node, int]:
+    """ Pick a random start and finish of a unit-cost maze that are between `min_distance` and `max_distance` moves apart.
 
+    Each random start costs one `distance_field` pass, and the finish is drawn from every node in the band at once. If
+    none of the `attempts` starts has a node in the band, an end of the maze's diameter is used instead, which in a tree
+    has a node at every distance up to the diameter.
 
-def depth_first_search_recursive(maze: Maze, start: Node, finish: Node) -> tuple[dict, list[Node]]:
-    g_score = {start: 0}
-    move_map = {start: None}
-    _dfs_recurse(maze, start, finish, g_score, move_map)
-    if finish not in g_score:
-        raise RuntimeError(f"Could not find path from {start} to {finish}")
-    path = reconstruct_path(move_map, finish)
-    return g_score, path
+    Args:
+        maze: The maze to pick from, whose open edges must all have unit cost
+        min_distance: The fewest moves allowed between the start and finish
+        max_distance: The most moves allowed, or None for no limit
+        rng: The generator to draw from, or None for the shared module generator
+        attempts: The number of random starts to try before falling back to the diameter
+
+    Returns:
+        The start, the finish and the number of moves between them
+
+    Raises:
+        ValueError: If no pair of nodes in the band was found
+    """
+    rng = resolve_rng(rng)
+    if max_distance is None:
+        max_distance = maze.rows * maze.cols
+
+    for attempt in range(attempts + 1):
+        start = maze.random_node(rng) if attempt < attempts else maze_diameter(maze)[0]
+        distance, _ = distance_field(maze, start)
+        in_band = np.flatnonzero((distance >= max(min_distance, 0)) & (distance <= max_distance))
+        if in_band.size:
+            finish = divmod(int(rng.choice(in_band)), maze.cols)
+            return start, finish, int(distance[finish])
+
+    raise ValueError(f'Found no nodes between {min_distance} and {max_distance} moves apart')
 
 
-def depth_first_search_iterative(maze: Maze, start: Node, finish: Node) -> tuple[dict, list[Node]]:
-    frontier_stack = [start]
+def dijkstras(maze: Maze | MazeGraph, start: Node, finish: Node, *, move_history: list = None,
+              stats: SearchStats = None) -> tuple[dict, list[Node]]:
+    return weighted_a_star(maze, start, finish, weight=0, move_history=move_history, stats=stats)
 
-    move_map = {start: None}
-    g_score = {start: 0}
 
-    while frontier_stack:
-        current_node = frontier_stack.pop()
-        if current_node == finish:
-            return g_score, reconstruct_path(move_map, finish)
+def a_star(maze: Maze | MazeGraph, start: Node, finish: Node, *, move_history: list = None,
+           stats: SearchStats = None) -> tuple[dict, list[Node]]:
+    return weighted_a_star(maze, start, finish, weight=1, move_history=move_history, stats=stats)
 
-        for direction, node in maze.get_neighbours(current_node):
-            possible_g_score = g_score[current_node] + maze.edge_cost(current_node, direction)
-            if possible_g_score < g_score.get(node, float('inf')):
-                g_score[node] = possible_g_score
-                move_map[node] = current_node
 
-                if node not in frontier_stack:
-                    frontier_stack.append(node)
+def weighted_a_star(maze: Maze | MazeGraph, start: Node, finish: Node, *, weight: float = 2.0, move_history: list = None,
+                    stats: SearchStats = None) -> tuple[dict, list[Node]]:
+    start_key, finish_key = _graph_key(maze, start), _graph_key(maze, finish)
+    frontier = PriorityFrontier()
+    frontier.push(start_key, maze.find_distance(start_key, finish_key) * weight)
 
-    raise RuntimeError(f"Could not find path from {start} to {finish}")
+    move_map = {start_key: None}
+    g_score = {start_key: 0}
+
+    record = _history_recorder(maze, move_history)
+    if record:
+        record(start_key, Moves.Visit)
+    if stats is not None:
+        stats.queries += 1
+    with _phase(stats, 'search'):
+        while frontier:
+            current_node, _ = frontier.pop()
+            if current_node == finish_key:
+                break
+            if stats is not None:
+                stats.expanded += 1
+            if record:
+                record(current_node, Moves.Complete)
+
+            for node, cost in maze.weighted_neighbours(current_node):
+                possible_g_score = g_score[current_node] + cost
+                if possible_g_score < g_score.get(node, float('inf')):
+                    reopened = stats is not None and node in g_score and node not in frontier
+                    g_score[node] = possible_g_score
+                    move_map[node] = current_node
+
+                    # Re-pushing a node that is already queued lowers its priority. A node that was already expanded
+                    #  is re-opened, which is only possible if the heuristic function (find_distance) is not consistent
+                    frontier.push(node, possible_g_score + maze.find_distance(node, finish_key) * weight)
+                    if record:
+                        record(node, Moves.Visit)
+                    if stats is not None:
+                        _count_relaxation(stats, reopened, len(frontier))
+        else:
+            raise RuntimeError(f"Could not find path from {start} to {finish}: {move_map}")
+
+    with _phase(stats, 'reconstruct'):
+        return _solver_result(maze, g_score, reconstruct_path(move_map, finish_key))
+
+
+def _join_halves(g_score: dict, forward_map: dict, backward_map: dict, backward_score: dict, meeting,
+                 cost: float) -> list:
+    """ Join the two halves of a bidirectional search at their meeting node.
+
+    The scores of the backward half are rewritten as costs from the start, so `g_score` holds the cost of every node on
+    the returned path.
+    """
+    path = reconstruct_path(forward_map, meeting)
+    node = meeting
+    while (node := backward_map[node]) is not None:
+        path.append(node)
+        g_score[node] = cost - backward_score[node]
+    return path
+
+
+def bidirectional_a_star(maze: Maze | MazeGraph, start: Node, finish: Node, *, move_history: list = None,
+                         stats: SearchStats = None) -> tuple[dict, list[Node]]:
+    """ A* searching forward from the start and backward from the finish at once, until the two searches meet.
+
+    Both sides share the balanced potential `p(node) = (h(node, finish) - h(start, node)) / 2`, forward keys being
+    `g + p` and backward keys `g - p`. The two keys of a node then sum to the cost of the path through it, so once the
+    lowest keys of the two frontiers sum to at least the cheapest path found, no undiscovered path can be cheaper and
+    the search stops. Nodes whose `g` plus the distance to their side's target can not beat that path are never
+    pushed or expanded. The side with the smaller frontier is expanded each step.
+    """
+    start_key, finish_key = _graph_key(maze, start), _graph_key(maze, finish)
+    if start_key == finish_key:
+        return _solver_result(maze, {start_key: 0}, [start_key])
+
+    def potential(node) -> float:
+        return (maze.find_distance(node, finish_key) - maze.find_distance(start_key, node)) / 2
+
+    sides = []
+    for source, target, sign in ((start_key, finish_key, 1), (finish_key, start_key, -1)):
+        frontier = PriorityFrontier()
+        frontier.push(source, sign * potential(source))
+        sides.append((frontier, {source: 0}, {source: None}, target, sign))
+    (forward_frontier, forward_score, forward_map, *_), (backward_frontier, backward_score, backward_map, *_) = sides
+
+    best_cost, meeting = float('inf'), None
+    record = _history_recorder(maze, move_history)
+    if record:
+        record(start_key, Moves.Visit)
+        record(finish_key, Moves.Visit)
+    if stats is not None:
+        stats.queries += 1
+    with _phase(stats, 'search'):
+        while forward_frontier and backward_frontier:
+            if forward_frontier.peek() + backward_frontier.peek() >= best_cost:
+                break
+
+            is_forward = len(forward_frontier) <= len(backward_frontier)
+            frontier, g_score, move_map, target, sign = sides[0] if is_forward else sides[1]
+            other_score = backward_score if is_forward else forward_score
+
+            current_node, _ = frontier.pop()
+            if g_score[current_node] + maze.find_distance(current_node, target) >= best_cost:
+                continue
+            if stats is not None:
+                stats.expanded += 1
+            if record:
+                record(current_node, Moves.Complete)
+
+            for node, cost in maze.weighted_neighbours(current_node):
+                possible_g_score = g_score[current_node] + cost
+                if possible_g_score < g_score.get(node, float('inf')):
+                    reopened = stats is not None and node in g_score and node not in frontier
+                    g_score[node] = possible_g_score
+                    move_map[node] = current_node
+                    if node in other_score and possible_g_score + other_score[node] < best_cost:
+                        best_cost, meeting = possible_g_score + other_score[node], node
+
+                    if possible_g_score + maze.find_distance(node, target) >= best_cost:
+                        continue
+                    frontier.push(node, possible_g_score + sign * potential(node))
+                    if record:
+                        record(node, Moves.Visit)
+                    if stats is not None:
+                        _count_relaxation(stats, reopened, len(forward_frontier) + len(backward_frontier))
+
+        if meeting is None:
+            raise RuntimeError(f"Could not find path from {start} to {finish}")
+
+    with _phase(stats, 'reconstruct'):
+        path = _join_halves(forward_score, forward_map, backward_map, backward_score, meeting, best_cost)
+        return _solver_result(maze, forward_score, path)
+
+
+def bidirectional_breadth_first_search(maze: Maze | MazeGraph, start: Node, finish: Node, *, move_history: list = None,
+                                       stats: SearchStats = None) -> tuple[dict, list[Node]]:
+    """ Breadth first search from both ends at once, a whole level of the smaller frontier at a time.
+
+    Once a level reaches nodes seen by the other side, the cheapest of those meetings gives the path, which has the
+    fewest moves. As with a single breadth first search, that is only the cheapest path when every move costs the same.
+    """
+    start_key, finish_key = _graph_key(maze, start), _graph_key(maze, finish)
+    if start_key == finish_key:
+        return _solver_result(maze, {start_key: 0}, [start_key])
+
+    forward_frontier, forward_score, forward_map = [start_key], {start_key: 0}, {start_key: None}
+    backward_frontier, backward_score, backward_map = [finish_key], {finish_key: 0}, {finish_key: None}
+
+    best_cost, meeting = float('inf'), None
+    record = _history_recorder(maze, move_history)
+    if record:
+        record(start_key, Moves.Visit)
+        record(finish_key, Moves.Visit)
+    if stats is not None:
+        stats.queries += 1
+    with _phase(stats, 'search'):
+        while forward_frontier and backward_frontier and meeting is None:
+            is_forward = len(forward_frontier) <= len(backward_frontier)
+            if is_forward:
+                frontier, g_score, move_map, other_score = forward_frontier, forward_score, forward_map, backward_score
+            else:
+                frontier, g_score, move_map, other_score = backward_frontier, backward_score, backward_map, forward_score
+
+            next_frontier = []
+            for current_node in frontier:
+                if stats is not None:
+                    stats.expanded += 1
+                if record:
+                    record(current_node, Moves.Complete)
+                for node, cost in maze.weighted_neighbours(current_node):
+                    if node in g_score:
+                        continue
+                    g_score[node] = g_score[current_node] + cost
+                    move_map[node] = current_node
+                    next_frontier.append(node)
+                    if record:
+                        record(node, Moves.Visit)
+                    if node in other_score and g_score[node] + other_score[node] < best_cost:
+                        best_cost, meeting = g_score[node] + other_score[node], node
+            if stats is not None:
+                stats.relaxed += len(next_frontier)
+                stats.frontier_peak = max(stats.frontier_peak, len(next_frontier) + len(
+                    backward_frontier if is_forward else forward_frontier))
+
+            if is_forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        if meeting is None:
+            raise RuntimeError(f"Could not find path from {start} to {finish}")
+
+    with _phase(stats, 'reconstruct'):
+        path = _join_halves(forward_score, forward_map, backward_map, backward_score, meeting, best_cost)
+        return _solver_result(maze, forward_score, path)
+
+
+def breadth_first_search(maze: Maze | MazeGraph, start: Node, finish: Node, *, move_history: list = None,
+                         stats: SearchStats = None) -> tuple[dict, list[Node]]:
+    start_key, finish_key = _graph_key(maze, start), _graph_key(maze, finish)
+    frontier_queue = deque([start_key])
+
+    move_map = {start_key: None}
+    g_score = {start_key: 0}
+
+    record = _history_recorder(maze, move_history)
+    if record:
+        record(start_key, Moves.Visit)
+    if stats is not None:
+        stats.queries += 1
+    with _phase(stats, 'search'):
+        while frontier_queue:
+            current_node = frontier_queue.popleft()
+            if current_node == finish_key:
+                break
+            if stats is not None:
+                stats.expanded += 1
+            if record:
+                record(current_node, Moves.Complete)
+
+            for node, cost in maze.weighted_neighbours(current_node):
+                possible_g_score = g_score[current_node] + cost
+                if possible_g_score < g_score.get(node, float('inf')):
+                    queued = node in frontier_queue
+                    reopened = stats is not None and node in g_score and not queued
+                    g_score[node] = possible_g_score
+                    move_map[node] = current_node
+
+                    if not queued:
+                        frontier_queue.append(node)
+                        if record:
+                            record(node, Moves.Visit)
+                    if stats is not None:
+                        _count_relaxation(stats, reopened, len(frontier_queue))
+        else:
+            raise RuntimeError(f"Could not find path from {start} to {finish}")
+
+    with _phase(stats, 'reconstruct'):
+        return _solver_result(maze, g_score, reconstruct_path(move_map, finish_key))
+
+
+def _dfs_recurse(maze: Maze | MazeGraph, current_node, finish, g_score: dict, move_map: dict,
+                 stats: SearchStats | None, record, depth: int) -> bool:
+    if record:
+        record(current_node, Moves.Visit)
+    if current_node == finish:
+        return True
+    if stats is not None:
+        stats.expanded += 1
+
+    for node, cost in maze.weighted_neighbours(current_node):
+        if node in move_map:
+            continue
+        if stats is not None:
+            _count_relaxation(stats, False, depth + 1)
+        move_map[node] = current_node
+        g_score[node] = g_score[current_node] + cost
+        if _dfs_recurse(maze, node, finish, g_score, move_map, stats, record, depth + 1):
+            return True
+    if record:
+        record(current_node, Moves.Complete)
+    return False
+
+
+def depth_first_search_recursive(maze: Maze | MazeGraph, start: Node, finish: Node, *, move_history: list = None,
+                                 stats: SearchStats = None) -> tuple[dict, list[Node]]:
+    """ Depth first search by recursion, where the frontier peak counts the deepest recursion """
+    start_key, finish_key = _graph_key(maze, start), _graph_key(maze, finish)
+    g_score = {start_key: 0}
+    move_map = {start_key: None}
+
+    if stats is not None:
+        stats.queries += 1
+    with _phase(stats, 'search'):
+        _dfs_recurse(maze, start_key, finish_key, g_score, move_map, stats, _history_recorder(maze, move_history), 0)
+    if finish_key not in g_score:
+        raise RuntimeError(f"Could not find path from {start} to {finish}")
+
+    with _phase(stats, 'reconstruct'):
+        return _solver_result(maze, g_score, reconstruct_path(move_map, finish_key))
+
+
+def depth_first_search_iterative(maze: Maze | MazeGraph, start: Node, finish: Node, *, move_history: list = None,
+                                 stats: SearchStats = None) -> tuple[dict, list[Node]]:
+    start_key, finish_key = _graph_key(maze, start), _graph_key(maze, finish)
+    frontier_stack = [start_key]
+
+    move_map = {start_key: None}
+    g_score = {start_key: 0}
+
+    record = _history_recorder(maze, move_history)
+    if record:
+        record(start_key, Moves.Visit)
+    if stats is not None:
+        stats.queries += 1
+    with _phase(stats, 'search'):
+        while frontier_stack:
+            current_node = frontier_stack.pop()
+            if current_node == finish_key:
+                break
+            if stats is not None:
+                stats.expanded += 1
+            if record:
+                record(current_node, Moves.Complete)
+
+            for node, cost in maze.weighted_neighbours(current_node):
+                possible_g_score = g_score[current_node] + cost
+                if possible_g_score < g_score.get(node, float('inf')):
+                    stacked = node in frontier_stack
+                    reopened = stats is not None and node in g_score and not stacked
+                    g_score[node] = possible_g_score
+                    move_map[node] = current_node
+
+                    if not stacked:
+                        frontier_stack.append(node)
+                        if record:
+                            record(node, Moves.Visit)
+                    if stats is not None:
+                        _count_relaxation(stats, reopened, len(frontier_stack))
+        else:
+            raise RuntimeError(f"Could not find path from {start} to {finish}")
+
+    with _phase(stats, 'reconstruct'):
+        return _solver_result(maze, g_score, reconstruct_path(move_map, finish_key))
 
 
 if __name__ == '__main__':
@@ -181,6 +760,7 @@ if __name__ == '__main__':
         maze = RectangularMaze(MAZE_DIMS)
         maze_maker(maze)
         maze_count += 1
+        paths = PathCache(maze)
 
         for _ in range(int(MAZE_DIMS[0] * MAZE_DIMS[1] * 0.1)):
             solve_count += 1
@@ -188,8 +768,7 @@ if __name__ == '__main__':
             for _, finish in maze.get_neighbours(start):
 
                 LOG.debug(f"Beginning search at {start}")
-                g_scores, path = maze_solver(maze, start, finish)
-                finish_score = g_scores[finish]
+                finish_score, _path = paths.query(start, finish)
 
                 LOG.debug(f"Reached {finish} with a cost of {finish_score}")
                 if finish_score >= minimum_path_cost:
@@ -197,6 +776,7 @@ if __name__ == '__main__':
             if finish_score >= minimum_path_cost:
                 break
 
-    LOG.info(f"Attempted {solve_count} solves on {maze_count} mazes")
-    AsciiView(maze, start, finish, path)
+    LOG.info(f"Attempted {solve_count} solves on {maze_count} mazes, {paths.hits} answered from the cache")
+    g_scores, path = maze_solver(maze, start, finish)
+    AsciiView(maze, start, finish, path).show()
     TkView(maze, start, finish, path)
@@ -0,0 +1,182 @@
+""" A lowest common ancestor index for perfect mazes, answering distance and path queries in logarithmic time.
+
+A perfect maze is a spanning tree, so rooting it anywhere gives every cell a depth, and the distance between two cells
+is `depth[a] + depth[b] - 2 * depth[lca(a, b)]`. Ancestors are found by binary lifting, where `ancestors[k][i]` is the
+cell `2 ** k` steps above cell `i`.
+"""
+import logging
+
+import numpy as np
+
+from src.mazes.maze import (
+    DIRECTION_OFFSETS,
+    WALL_BITS,
+    Direction,
+    Node,
+    RectangularMaze,
+)
+from src.mazes.pathfinding import (
+    a_star,
+    distance_field,
+)
+
+LOG = logging.getLogger('TreeIndex')
+LOG.setLevel(logging.INFO)
+
+
+class TreeIndex:
+    """ Depths and binary lifting tables of a rectangular maze, rooted at its first cell.
+
+    Cell ids are `row * cols + col`, as in `MazeGraph`. When the maze has loops, is disconnected or has non-unit edge
+    costs it is not a unit-cost tree, so no tables are built and every query is passed on to `a_star` instead.
+
+    The index is rebuilt the next time it is queried after the maze has changed.
+    """
+
+    def __init__(self, maze: RectangularMaze):
+        self.maze = maze
+        self.version = None
+        self.refresh()
+
+    @property
+    def is_stale(self) -> bool:
+        return self.version != self.maze.version
+
+    def refresh(self):
+        """ Rebuild the index if the maze has changed since it was built """
+        if self.is_stale:
+            self.version = self.maze.version
+            self._build()
+
+    def _build(self):
+        maze = self.maze
+        rows, cols = maze.rows, maze.cols
+        self.depth = self.ancestors = None
+
+        wall_bits = maze.wall_bits()
+        open_edges = int(np.count_nonzero((wall_bits[:-1, :] & WALL_BITS[Direction.S]) == 0)
+                         + np.count_nonzero((wall_bits[:, :-1] & WALL_BITS[Direction.E]) == 0))
+        self.is_tree = open_edges == rows * cols - 1 and maze.has_unit_costs
+        if not self.is_tree:
+            LOG.debug(f'The {rows}x{cols} maze is not a unit-cost tree, queries will fall back to a_star')
+            return
+
+        depth, parent_direction = distance_field(maze, (0, 0))
+        depth, parent_direction = depth.reshape(-1), parent_direction.reshape(-1)
+        if (depth < 0).any():
+            self.is_tree = False
+            return
+
+        id_dtype = np.int32 if rows * cols < 2 ** 31 else np.int64
+        offsets = np.array([d_row * cols + d_col for d_row, d_col in DIRECTION_OFFSETS] + [0], dtype=id_dtype)
+        # The root's direction is -1, which picks the trailing zero offset and makes it its own parent
+        parent = np.arange(rows * cols, dtype=id_dtype) + offsets[parent_direction]
+
+        ancestors = [parent]
+        for _ in range(1, max(1, int(depth.max()).bit_length())):
+            ancestors.append(ancestors[-1][ancestors[-1]])
+
+        self.depth = depth
+        self.ancestors = ancestors
+        self._depth = memoryview(depth)
+        self._ancestors = [memoryview(level) for level in ancestors]
+
+    def _node_id(self, node: Node) -> int:
+        row, col = node
+        if not (0 <= row < self.maze.rows and 0 <= col < self.maze.cols):
+            raise KeyError(f'Node {node} is outside the {self.maze.rows}x{self.maze.cols} maze')
+        return row * self.maze.cols + col
+
+    def _lca(self, id_a: int, id_b: int) -> int:
+        depth, ancestors = self._depth, self._ancestors
+        if depth[id_a] < depth[id_b]:
+            id_a, id_b = id_b, id_a
+
+        climb = depth[id_a] - depth[id_b]
+        level = 0
+        while climb:
+            if climb & 1:
+                id_a = ancestors[level][id_a]
+            climb >>= 1
+            level += 1
+        if id_a == id_b:
+            return id_a
+
+        for level in reversed(ancestors):
+            if level[id_a] != level[id_b]:
+                id_a, id_b = level[id_a], level[id_b]
+        return ancestors[0][id_a]
+
+    def lca(self, node_a: Node, node_b: Node) -> Node:
+        """ The cell where the paths from two cells to the root first meet """
+        self.refresh()
+        if not self.is_tree:
+            raise ValueError('The maze is not a unit-cost tree, so it has no lowest common ancestors')
+        return divmod(self._lca(self._node_id(node_a), self._node_id(node_b)), self.maze.cols)
+
+    def distance(self, node_a: Node, node_b: Node) -> float:
+        """ The cost of the path between two cells """
+        self.refresh()
+        if not self.is_tree:
+            return a_star(self.maze, node_a, node_b)[0][node_b]
+
+        id_a, id_b = self._node_id(node_a), self._node_id(node_b)
+        return self._depth[id_a] + self._depth[id_b] - 2 * self._depth[self._lca(id_a, id_b)]
+
+    def path(self, node_a: Node, node_b: Node) -> list[Node]:
+        """ The cells along the path from `node_a` to `node_b`, inclusive """
+        self.refresh()
+        if not self.is_tree:
+            return a_star(self.maze, node_a, node_b)[1]
+
+        id_a, id_b = self._node_id(node_a), self._node_id(node_b)
+        meeting = self._lca(id_a, id_b)
+        parent = self._ancestors[0]
+
+        rising, falling = [id_a], [id_b]
+        while rising[-1] != meeting:
+            rising.append(parent[rising[-1]])
+        while falling[-1] != meeting:
+            falling.append(parent[falling[-1]])
+        return [divmod(cell, self.maze.cols) for cell in rising + falling[-2::-1]]
+
+    def distances(self, starts, finishes) -> np.ndarray:
+        """ The path costs between many pairs of cells at once.
+
+        Args:
+            starts: An `(n, 2)` array-like of the first cell of each pair
+            finishes: An `(n, 2)` array-like of the second cell of each pair
+
+        Returns:
+            An `(n,)` array of the cost between each pair
+        """
+        self.refresh()
+        starts = np.asarray(starts, dtype=np.intp).reshape(-1, 2)
+        finishes = np.asarray(finishes, dtype=np.intp).reshape(-1, 2)
+        if not self.is_tree:
+            return np.array([self.distance(tuple(start), tuple(finish)) for start, finish in zip(starts, finishes)],
+                            dtype=np.float64)
+
+        shape = (self.maze.rows, self.maze.cols)
+        id_a = np.ravel_multi_index((starts[:, 0], starts[:, 1]), shape)
+        id_b = np.ravel_multi_index((finishes[:, 0], finishes[:, 1]), shape)
+        return self.depth[id_a] + self.depth[id_b] - 2 * self.depth[self._batch_lca(id_a, id_b)]
+
+    def _batch_lca(self, id_a: np.ndarray, id_b: np.ndarray) -> np.ndarray:
+        depth, ancestors = self.depth, self.ancestors
+
+        # Make `id_a` the deeper of each pair, then lift it to the depth of `id_b`
+        swap = depth[id_a] < depth[id_b]
+        id_a, id_b = np.where(swap, id_b, id_a), np.where(swap, id_a, id_b)
+        climb = depth[id_a] - depth[id_b]
+        for level, ancestor in enumerate(ancestors):
+            lift = (climb >> level) & 1 == 1
+            id_a = np.where(lift, ancestor[id_a], id_a)
+
+        # Lift both as far as possible while they still differ, leaving them just below their common ancestor
+        for ancestor in reversed(ancestors):
+            up_a, up_b = ancestor[id_a], ancestor[id_b]
+            differ = up_a != up_b
+            id_a = np.where(differ, up_a, id_a)
+            id_b = np.where(differ, up_b, id_b)
+        return np.where(id_a == id_b, id_a, ancestors[0][id_a])